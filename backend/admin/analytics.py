@@ -0,0 +1,118 @@
+from collections import defaultdict
+from users.models import Users
+from booking.rollups import booking_totals, booking_series
+from .serializers import OrganizerStatsSerializer, EventStatsSerializer
+
+
+def build_dashboard(events_qs, bookings_qs, rollups_qs):
+    # Bookings are totalled once per (event, payment status), from the daily rollups plus today's
+    # raw bookings; every breakdown on the dashboard is folded from that result in memory, so the
+    # page costs the same four queries at any data size
+    events = list(events_qs.select_related('hostedBy', 'category'))
+    booking_stats = booking_totals(rollups_qs, bookings_qs, ['event_id', 'payment_status'])
+
+    confirmed = defaultdict(lambda: {'bookings': 0, 'revenue': None})
+    by_status = defaultdict(lambda: {'count': 0, 'revenue': None})
+    for row in booking_stats:
+        status_totals = by_status[row['payment_status']]
+        status_totals['count'] += row['bookings']
+        status_totals['revenue'] = _add(status_totals['revenue'], row['revenue'])
+        if row['payment_status'] == 'confirmed':
+            confirmed[row['event_id']] = {'bookings': row['bookings'], 'revenue': row['revenue']}
+
+    by_status = dict(by_status)
+
+    for event in events:
+        event.total_revenue = confirmed[event.eventId]['revenue']
+        event.confirmed_bookings = confirmed[event.eventId]['bookings']
+
+    return {
+        'organizers': _get_organizers_data(events),
+        'events': EventStatsSerializer(_order_by_revenue(events, lambda event: event.total_revenue), many=True).data,
+        'revenue': _get_revenue_analytics(rollups_qs, bookings_qs, by_status),
+        'categories': _get_categories_data(events),
+        'summary': _get_summary_statistics(events, by_status),
+    }
+
+
+def _get_organizers_data(events):
+    totals = defaultdict(lambda: {'events': 0, 'bookings': 0, 'revenue': None})
+    for event in events:
+        organizer_totals = totals[event.hostedBy_id]
+        organizer_totals['events'] += 1
+        organizer_totals['bookings'] += event.confirmed_bookings
+        organizer_totals['revenue'] = _add(organizer_totals['revenue'], event.total_revenue)
+
+    # Every organizer is listed, including those with no events in the filtered range
+    organizers = list(Users.objects.filter(role='organizer'))
+    for organizer in organizers:
+        organizer.total_events = totals[organizer.user_id]['events']
+        organizer.total_bookings = totals[organizer.user_id]['bookings']
+        organizer.total_revenue = totals[organizer.user_id]['revenue']
+
+    return OrganizerStatsSerializer(_order_by_revenue(organizers, lambda organizer: organizer.total_revenue), many=True).data
+
+
+def _get_revenue_analytics(rollups_qs, bookings_qs, by_status):
+    daily_revenue = booking_series(rollups_qs.filter(payment_status='confirmed'), bookings_qs.filter(payment_status='confirmed'), 'day')
+
+    revenue_by_status = [
+        {'payment_status': payment_status, 'count': totals['count'], 'revenue': totals['revenue']}
+        for payment_status, totals in by_status.items()
+    ]
+
+    return {
+        'total_revenue': _status_totals(by_status, 'confirmed')['revenue'] or 0,
+        'by_status': _order_by_revenue(revenue_by_status, lambda row: row['revenue']),
+        'daily_breakdown': [
+            {'day': row['day'], 'revenue': row['revenue'], 'bookings_count': row['bookings']}
+            for row in daily_revenue
+        ]
+    }
+
+
+def _get_categories_data(events):
+    categories = {}
+    for event in events:
+        category = categories.setdefault(event.category_id, {
+            'category_id': str(event.category_id),
+            'category_name': event.category.categoryName,
+            'total_events': 0,
+            'total_revenue': None,
+            'total_bookings': 0
+        })
+        category['total_events'] += 1
+        category['total_bookings'] += event.confirmed_bookings
+        category['total_revenue'] = _add(category['total_revenue'], event.total_revenue)
+
+    ordered = _order_by_revenue(list(categories.values()), lambda category: category['total_revenue'])
+    for category in ordered:
+        category['total_revenue'] = category['total_revenue'] or 0
+    return ordered
+
+
+def _get_summary_statistics(events, by_status):
+    return {
+        'total_events': len(events),
+        'total_organizers': len({event.hostedBy_id for event in events}),
+        'total_bookings': _status_totals(by_status, 'confirmed')['count'],
+        'total_revenue': _status_totals(by_status, 'confirmed')['revenue'] or 0,
+        'pending_bookings': _status_totals(by_status, 'pending')['count'],
+        'cancelled_bookings': _status_totals(by_status, 'cancelled')['count'],
+    }
+
+
+def _status_totals(by_status, payment_status):
+    return by_status.get(payment_status, {'count': 0, 'revenue': None})
+
+
+def _add(total, value):
+    # SUM over no rows is NULL in SQL, so totals stay None until a value arrives
+    if value is None:
+        return total
+    return value if total is None else total + value
+
+
+def _order_by_revenue(rows, revenue):
+    # Same order as ORDER BY revenue DESC on Postgres, where rows without revenue come first
+    return sorted(rows, key=lambda row: (revenue(row) is None, revenue(row) or 0), reverse=True)
@@ -1,7 +1,5 @@
-from django.core.mail import send_mail
-from django.utils.html import strip_tags
-from django.conf import settings
 from django.utils import timezone
+from notifications.outbox import enqueue_email
 
 
 def send_organizer_approval_email(email, first_name):
@@ -29,15 +27,7 @@ def send_organizer_approval_email(email, first_name):
         </body>
     </html>
     """
-    plain_message = strip_tags(html_message)
-    send_mail(
-        'Eventify: Organizer Application Approved!',
-        plain_message,
-        settings.EMAIL_HOST_USER,
-        [email],
-        fail_silently=False,
-        html_message=html_message,
-    )
+    enqueue_email('Eventify: Organizer Application Approved!', html_message, [email])
 
 def send_organizer_rejection_email(email, first_name, reason):
     html_message = f"""
@@ -60,13 +50,5 @@ def send_organizer_rejection_email(email, first_name, reason):
         </body>
     </html>
     """
-    plain_message = strip_tags(html_message)
-    send_mail(
-        'Eventify: Organizer Application Status Update',
-        plain_message,
-        settings.EMAIL_HOST_USER,
-        [email],
-        fail_silently=False,
-        html_message=html_message,
-    )
+    enqueue_email('Eventify: Organizer Application Status Update', html_message, [email])
 
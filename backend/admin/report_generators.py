@@ -7,6 +7,22 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.enums import TA_CENTER
 from datetime import datetime, date
+from eventify.exports import column_rows, stream_csv, stream_xlsx
+
+
+BOOKING_COLUMNS = [
+    ('booking_id', 'Booking ID'),
+    ('booking_name', 'Booking Name'),
+    ('total_price', 'Amount'),
+    ('booking_date', 'Booking Date'),
+    ('event__title', 'Event Title'),
+    ('event__hostedBy__full_name', 'Organizer'),
+    ('event__category__categoryName', 'Category'),
+    ('event__date', 'Event Date'),
+    ('event__location', 'Location'),
+    ('payment_id', 'Payment ID'),
+    ('payment_date', 'Payment Date'),
+]
 
 
 class ExcelReportGenerator:
@@ -23,7 +39,20 @@ class ExcelReportGenerator:
         buffer.seek(0)
         return buffer
     
-    def _create_summary_sheet(self, writer, report_data):
+    def stream_revenue_report(self, report_data):
+        # Same sheets as generate_revenue_report, but bookings are written as they are fetched
+        return stream_xlsx([
+            ('Summary', ['Metric', 'Value'], self._summary_rows(report_data)),
+            ('Detailed Bookings', [label for _, label in BOOKING_COLUMNS], column_rows(report_data['bookings'], BOOKING_COLUMNS)),
+            ('Revenue by Organizer', ['Organizer Name', 'Email', 'Total Revenue', 'Total Bookings', 'Total Events'],
+             [list(row.values()) for row in report_data['organizer_revenue']]),
+            ('Revenue by Category', ['Category', 'Total Revenue', 'Total Bookings', 'Total Events'],
+             [list(row.values()) for row in report_data['category_revenue']]),
+            ('Daily Revenue', ['Date', 'Revenue', 'Bookings Count'],
+             [list(row.values()) for row in report_data['daily_revenue']]),
+        ])
+    
+    def _summary_rows(self, report_data):
         summary = report_data['summary']
         generated_at = summary['generated_at']
         if hasattr(generated_at, 'strftime'):
@@ -31,15 +60,16 @@ class ExcelReportGenerator:
         else:
             generated_at_str = str(generated_at)
         
-        summary_data = [
+        return [
             ['Report Generated', generated_at_str],
             ['', ''],
             ['Total Events', summary['total_events']],
             ['Total Revenue', f"₹{summary['total_revenue']:,.2f}"],
             ['Total Bookings', summary['total_bookings']],
         ]
-        
-        df = pd.DataFrame(summary_data, columns=['Metric', 'Value'])
+    
+    def _create_summary_sheet(self, writer, report_data):
+        df = pd.DataFrame(self._summary_rows(report_data), columns=['Metric', 'Value'])
         df.to_excel(writer, sheet_name='Summary', index=False)
     
     def _create_bookings_sheet(self, writer, report_data):
@@ -85,6 +115,11 @@ class ExcelReportGenerator:
             df.to_excel(writer, sheet_name='Daily Revenue', index=False)
 
 
+class CSVReportGenerator:
+    def stream_revenue_report(self, report_data):
+        return stream_csv([label for _, label in BOOKING_COLUMNS], column_rows(report_data['bookings'], BOOKING_COLUMNS))
+
+
 class PDFReportGenerator:
     def __init__(self):
         self.styles = getSampleStyleSheet()
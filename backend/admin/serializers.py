@@ -14,7 +14,7 @@ class EventDetailWithHostSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ['search_vector']
 
 
 class OrganizerStatsSerializer(serializers.ModelSerializer):
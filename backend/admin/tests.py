@@ -1,3 +1,85 @@
 from django.test import TestCase
+from django.utils import timezone
+from datetime import date, time, timedelta
+from users.models import Users
+from categories.models import Category
+from events.models import Event
+from booking.models import Booking, DailyBookingRollup
+from booking.rollups import reconcile_rollups
+from .analytics import build_dashboard
 
-# Create your tests here.
+
+class DashboardAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = Users.objects.create_user(email='host@example.com', password='pass', full_name='Host', mobile=9000000001, role='organizer')
+        cls.idle_organizer = Users.objects.create_user(email='idle@example.com', password='pass', full_name='Idle', mobile=9000000002, role='organizer')
+        cls.customer = Users.objects.create_user(email='guest@example.com', password='pass', full_name='Guest', mobile=9000000003)
+        cls.music = Category.objects.create(categoryName='Music')
+        cls.sports = Category.objects.create(categoryName='Sports')
+
+        event_date = date.today() + timedelta(days=7)
+        cls.concert = Event.objects.create(
+            title='Concert', category=cls.music, pricePerTicket=500, ticketLimit=100,
+            hostedBy=cls.organizer, description='Live music', date=event_date, time=time(18, 0)
+        )
+        cls.match = Event.objects.create(
+            title='Match', category=cls.sports, pricePerTicket=300, ticketLimit=100,
+            hostedBy=cls.organizer, description='Final', date=event_date, time=time(15, 0)
+        )
+        for payment_status, price in [('confirmed', 500), ('confirmed', 500), ('pending', 500), ('cancelled', 500)]:
+            Booking.objects.create(user=cls.customer, event=cls.concert, booking_name='Guest', total_price=price, payment_status=payment_status)
+
+    def test_dashboard_runs_a_fixed_number_of_queries(self):
+        with self.assertNumQueries(4):
+            build_dashboard(Event.objects.all(), Booking.objects.all(), DailyBookingRollup.objects.all())
+
+        for index in range(20):
+            Booking.objects.create(user=self.customer, event=self.match, booking_name=f'Guest {index}', total_price=300, payment_status='confirmed')
+        with self.assertNumQueries(4):
+            build_dashboard(Event.objects.all(), Booking.objects.all(), DailyBookingRollup.objects.all())
+
+    def test_dashboard_breakdowns(self):
+        data = build_dashboard(Event.objects.all(), Booking.objects.all(), DailyBookingRollup.objects.all())
+
+        self.assertEqual(data['summary'], {
+            'total_events': 2,
+            'total_organizers': 1,
+            'total_bookings': 2,
+            'total_revenue': 1000,
+            'pending_bookings': 1,
+            'cancelled_bookings': 1,
+        })
+        self.assertEqual(data['revenue']['total_revenue'], 1000)
+        self.assertEqual({row['payment_status']: row['count'] for row in data['revenue']['by_status']}, {'confirmed': 2, 'pending': 1, 'cancelled': 1})
+
+        organizers = {row['email']: row for row in data['organizers']}
+        self.assertEqual(organizers['host@example.com']['total_events'], 2)
+        self.assertEqual(organizers['host@example.com']['total_bookings'], 2)
+        self.assertEqual(organizers['idle@example.com']['total_events'], 0)
+
+        categories = {row['category_name']: row for row in data['categories']}
+        self.assertEqual(categories['Music']['total_revenue'], 1000)
+        self.assertEqual(categories['Sports']['total_revenue'], 0)
+
+        events = {row['title']: row for row in data['events']}
+        self.assertEqual(events['Concert']['confirmed_bookings'], 2)
+        self.assertEqual(events['Match']['confirmed_bookings'], 0)
+
+    def test_past_days_are_read_from_rollups(self):
+        Booking.objects.filter(payment_status__in=['confirmed', 'pending']).update(booking_date=timezone.now() - timedelta(days=3))
+        reconcile_rollups()
+        Booking.objects.create(user=self.customer, event=self.match, booking_name='Guest', total_price=300, payment_status='confirmed')
+
+        data = build_dashboard(Event.objects.all(), Booking.objects.all(), DailyBookingRollup.objects.all())
+        self.assertEqual(data['summary']['total_bookings'], 3)
+        self.assertEqual(data['summary']['total_revenue'], 1300)
+        self.assertEqual([row['bookings_count'] for row in data['revenue']['daily_breakdown']], [2, 1])
+
+        # A transition on a past day refreshes that day's rollup once the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.filter(payment_status='pending').update(payment_status='confirmed')
+        data = build_dashboard(Event.objects.all(), Booking.objects.all(), DailyBookingRollup.objects.all())
+        self.assertEqual(data['summary']['total_bookings'], 4)
+        self.assertEqual(data['summary']['pending_bookings'], 0)
+        self.assertEqual(data['revenue']['daily_breakdown'][0]['revenue'], 1500)
@@ -2,7 +2,8 @@ from django.urls import path
 from .views import (
     AdminLoginView, UserListView, UserStatusUpdateView, PendingOrganizerProfilesView,
     EventHoldStatusView, AdminEventListView, EventSettlementView, AdminWalletView,
-    AdminDashboardView, AdminFiltersView, DownloadRevenueReportViewPDF, DownloadRevenueReportViewExcel
+    AdminDashboardView, AdminFiltersView, DownloadRevenueReportViewPDF, DownloadRevenueReportViewExcel,
+    DownloadRevenueReportViewCSV, EmailOutboxMetricsView, ActivityTrackerMetricsView, ChatEventMetricsView
 )
 
 
@@ -12,6 +13,7 @@ urlpatterns = [
     path('dashboard/filters/', AdminFiltersView.as_view(), name='admin-filters'),
     path('dashboard/download-report-pdf/', DownloadRevenueReportViewPDF.as_view(), name='download-revenue-report-pdf'),
     path('dashboard/download-report-excel/', DownloadRevenueReportViewExcel.as_view(), name='download-revenue-report-excel'),
+    path('dashboard/download-report-csv/', DownloadRevenueReportViewCSV.as_view(), name='download-revenue-report-csv'),
     path('user-list/', UserListView.as_view(), name='user-list'),
     path('users-status/<uuid:user_id>/', UserStatusUpdateView.as_view(), name='admin-user-status-update'),
     path('pending-organizers/', PendingOrganizerProfilesView.as_view(), name='pending-organizers'),
@@ -19,5 +21,8 @@ urlpatterns = [
     path('toggle-hold/<uuid:event_id>/', EventHoldStatusView.as_view(), name='toggle_event_hold'),
     path('events/settle/', EventSettlementView.as_view(), name='event-settlement'),
     path('wallet/', AdminWalletView.as_view(), name='admin-wallet'),
+    path('metrics/email-outbox/', EmailOutboxMetricsView.as_view(), name='email-outbox-metrics'),
+    path('metrics/activity/', ActivityTrackerMetricsView.as_view(), name='activity-tracker-metrics'),
+    path('metrics/chat-events/', ChatEventMetricsView.as_view(), name='chat-event-metrics'),
 ]
 
@@ -7,7 +7,7 @@ from rest_framework.decorators import permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.pagination import PageNumberPagination
 from django.utils import timezone
-from django.db.models import Q, Sum, Count
+from django.db.models import Q, Sum
 from django.db import transaction, models
 from datetime import datetime, timedelta, date
 from django.shortcuts import get_object_or_404
@@ -17,15 +17,22 @@ from organizers.models import OrganizerProfile
 from organizers.serializers import OrganizerProfileSerializer
 from events.models import Event
 from events.serializers import EventSerializer
+from events.search import search_events
 from wallet.models import OrganizerWallet, OrganizerWalletTransaction, CompanyWallet
 from wallet.serializers import CompanyWalletSerializer
 import logging
 from categories.models import Category
-from booking.models import Booking
+from booking.models import Booking, DailyBookingRollup
+from booking.rollups import booking_totals, booking_series
+from notifications.outbox import outbox_metrics
+from chat.activity import activity_tracker
+from chat.throttle import event_metrics
+from eventify.exports import streaming_export, EXPORT_CHUNK_SIZE, CSV_CONTENT_TYPE, XLSX_CONTENT_TYPE
 from .permissions import IsAdminUser
-from .serializers import UserListSerializer, EventDetailWithHostSerializer, OrganizerStatsSerializer, EventStatsSerializer
+from .serializers import UserListSerializer, EventDetailWithHostSerializer
 from .email_utils import send_organizer_approval_email, send_organizer_rejection_email
-from .report_generators import ExcelReportGenerator, PDFReportGenerator
+from .report_generators import ExcelReportGenerator, PDFReportGenerator, CSVReportGenerator
+from .analytics import build_dashboard
 
 
 logger = logging.getLogger(__name__)
@@ -94,23 +101,10 @@ class AdminDashboardView(APIView):
         }
     
     def _get_dashboard_data(self, filters):
-        events_qs = Event.objects.select_related('hostedBy', 'category')
-        bookings_qs = Booking.objects.select_related('event', 'user', 'event__hostedBy', 'event__category')
-        
-        events_qs, bookings_qs = self._apply_filters(events_qs, bookings_qs, filters)
-        organizers_data = self._get_organizers_data(events_qs, bookings_qs)
-        events_data = self._get_events_data(events_qs, bookings_qs)
-        revenue_data = self._get_revenue_analytics(bookings_qs)
-        categories_data = self._get_categories_data(events_qs, bookings_qs)
-        summary_stats = self._get_summary_statistics(events_qs, bookings_qs)
-        
-        return {
-            'organizers': organizers_data,
-            'events': events_data,
-            'revenue': revenue_data,
-            'categories': categories_data,
-            'summary': summary_stats
-        }
+        events_qs, bookings_qs = self._apply_filters(Event.objects.all(), Booking.objects.all(), filters)
+        # Every booking filter here narrows by event, so the rollups follow the filtered events
+        rollups_qs = DailyBookingRollup.objects.filter(event__in=events_qs.values('eventId'))
+        return build_dashboard(events_qs, bookings_qs, rollups_qs)
     
     def _apply_filters(self, events_qs, bookings_qs, filters):
         if filters['start_date']:
@@ -139,96 +133,11 @@ class AdminDashboardView(APIView):
                 events_qs = events_qs.filter(on_hold=True)
                 bookings_qs = bookings_qs.filter(event__on_hold=True)
         if filters['search']:
-            search_q = Q(title__icontains=filters['search']) | \
-                      Q(hostedBy__full_name__icontains=filters['search']) | \
-                      Q(category__categoryName__icontains=filters['search'])
-            events_qs = events_qs.filter(search_q)
-            
-            booking_search_q = Q(event__title__icontains=filters['search']) | \
-                              Q(event__hostedBy__full_name__icontains=filters['search']) | \
-                              Q(event__category__categoryName__icontains=filters['search'])
-            bookings_qs = bookings_qs.filter(booking_search_q)
+            events_qs = search_events(events_qs, filters['search'], ranked=False)
+            matching_events = search_events(Event.objects.all(), filters['search'], ranked=False)
+            bookings_qs = bookings_qs.filter(event__in=matching_events.values('eventId'))
         
         return events_qs, bookings_qs
-    
-    def _get_organizers_data(self, events_qs, bookings_qs):
-        organizers = Users.objects.filter(role='organizer').annotate(
-            total_events=Count('events_hosted', filter=Q(events_hosted__in=events_qs)),
-            total_revenue=Sum('events_hosted__bookings__total_price', 
-                            filter=Q(events_hosted__bookings__in=bookings_qs, 
-                                    events_hosted__bookings__payment_status='confirmed')),
-            total_bookings=Count('events_hosted__bookings', 
-                               filter=Q(events_hosted__bookings__in=bookings_qs,
-                                       events_hosted__bookings__payment_status='confirmed'))
-        ).order_by('-total_revenue')
-        
-        return OrganizerStatsSerializer(organizers, many=True).data
-    
-    def _get_events_data(self, events_qs, bookings_qs):
-        events = events_qs.annotate(
-            total_revenue=Sum('bookings__total_price', 
-                            filter=Q(bookings__in=bookings_qs, bookings__payment_status='confirmed')),
-            confirmed_bookings=Count('bookings', 
-                                   filter=Q(bookings__in=bookings_qs, bookings__payment_status='confirmed'))
-        ).order_by('-total_revenue')
-        
-        return EventStatsSerializer(events, many=True).data
-    
-    def _get_revenue_analytics(self, bookings_qs):
-        confirmed_bookings = bookings_qs.filter(payment_status='confirmed')
-        
-        total_revenue = confirmed_bookings.aggregate(
-            total=Sum('total_price')
-        )['total'] or 0
-        
-        revenue_by_status = bookings_qs.values('payment_status').annotate(
-            count=Count('booking_id'),
-            revenue=Sum('total_price')
-        ).order_by('-revenue')
-        
-        daily_revenue = confirmed_bookings.extra(
-            select={'day': 'DATE(booking_date)'}
-        ).values('day').annotate(
-            revenue=Sum('total_price'),
-            bookings_count=Count('booking_id')
-        ).order_by('day')
-        
-        return {
-            'total_revenue': total_revenue,
-            'by_status': list(revenue_by_status),
-            'daily_breakdown': list(daily_revenue)
-        }
-    
-    def _get_categories_data(self, events_qs, bookings_qs):
-        categories = Category.objects.annotate(
-            total_events=Count('event', filter=Q(event__in=events_qs)),
-            total_revenue=Sum('event__bookings__total_price', 
-                            filter=Q(event__bookings__in=bookings_qs, 
-                                    event__bookings__payment_status='confirmed')),
-            total_bookings=Count('event__bookings', 
-                               filter=Q(event__bookings__in=bookings_qs,
-                                       event__bookings__payment_status='confirmed'))
-        ).filter(total_events__gt=0).order_by('-total_revenue')
-        
-        return [{
-            'category_id': str(cat.categoryId),
-            'category_name': cat.categoryName,
-            'total_events': cat.total_events,
-            'total_revenue': cat.total_revenue or 0,
-            'total_bookings': cat.total_bookings
-        } for cat in categories]
-    
-    def _get_summary_statistics(self, events_qs, bookings_qs):
-        confirmed_bookings = bookings_qs.filter(payment_status='confirmed')
-        
-        return {
-            'total_events': events_qs.count(),
-            'total_organizers': events_qs.values('hostedBy').distinct().count(),
-            'total_bookings': confirmed_bookings.count(),
-            'total_revenue': confirmed_bookings.aggregate(Sum('total_price'))['total_price__sum'] or 0,
-            'pending_bookings': bookings_qs.filter(payment_status='pending').count(),
-            'cancelled_bookings': bookings_qs.filter(payment_status='cancelled').count(),
-        }
 
 
 @permission_classes([IsAdminUser])
@@ -237,7 +146,8 @@ class DownloadRevenueReportViewPDF(APIView):
         try:
             events_qs = Event.objects.select_related('hostedBy', 'category')
             bookings_qs = Booking.objects.select_related('event', 'user', 'event__hostedBy', 'event__category')
-            report_data = prepare_report_data(events_qs, bookings_qs)
+            # The PDF only prints totals, so the booking rows are left unfetched
+            report_data = prepare_report_data(events_qs, bookings_qs, DailyBookingRollup.objects.all(), stream=True)
             
             pdf_generator = PDFReportGenerator()
             pdf_buffer = pdf_generator.generate_revenue_report(report_data)
@@ -258,7 +168,14 @@ class DownloadRevenueReportViewExcel(APIView):
             events_qs = Event.objects.select_related('hostedBy', 'category')
             bookings_qs = Booking.objects.select_related('event', 'user', 'event__hostedBy', 'event__category')
             
-            report_data = prepare_report_data(events_qs, bookings_qs)
+            if request.GET.get('stream') == 'true':
+                report_data = prepare_report_data(events_qs, bookings_qs, DailyBookingRollup.objects.all(), stream=True)
+                return streaming_export(
+                    request, ExcelReportGenerator().stream_revenue_report(report_data),
+                    f'revenue_report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx', XLSX_CONTENT_TYPE
+                )
+            
+            report_data = prepare_report_data(events_qs, bookings_qs, DailyBookingRollup.objects.all())
             excel_generator = ExcelReportGenerator()
             excel_buffer = excel_generator.generate_revenue_report(report_data)
             
@@ -273,15 +190,35 @@ class DownloadRevenueReportViewExcel(APIView):
             logger.error(f"Error generating Excel report: {e}")
             return Response({"success": False, "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+@permission_classes([IsAdminUser])
+class DownloadRevenueReportViewCSV(APIView):
+    def get(self, request):
+        try:
+            events_qs = Event.objects.all()
+            bookings_qs = Booking.objects.all()
+            report_data = prepare_report_data(events_qs, bookings_qs, DailyBookingRollup.objects.all(), stream=True)
+            
+            return streaming_export(
+                request, CSVReportGenerator().stream_revenue_report(report_data),
+                f'revenue_report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv', CSV_CONTENT_TYPE
+            )
+        except Exception as e:
+            logger.error(f"Error generating CSV report: {e}")
+            return Response({"success": False, "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     
-def prepare_report_data(events_qs, bookings_qs):
+def prepare_report_data(events_qs, bookings_qs, rollups_qs, stream=False):
     confirmed_bookings = bookings_qs.filter(payment_status='confirmed')
+    confirmed_rollups = rollups_qs.filter(payment_status='confirmed')
     generated_at = safe_make_naive(timezone.now())
     
+    event_totals = booking_totals(confirmed_rollups, confirmed_bookings, ['organizer_id', 'category_id', 'event_id'])
+    
     summary = {
         'total_events': events_qs.count(),
-        'total_revenue': confirmed_bookings.aggregate(Sum('total_price'))['total_price__sum'] or 0,
-        'total_bookings': confirmed_bookings.count(),
+        'total_revenue': sum(row['revenue'] for row in event_totals),
+        'total_bookings': sum(row['bookings'] for row in event_totals),
         'report_period': {
             'start_date': 'All time',
             'end_date': 'All time'
@@ -295,46 +232,55 @@ def prepare_report_data(events_qs, bookings_qs):
         'event__date', 'event__location', 'payment_id', 'payment_date'
     ).order_by('-booking_date')
 
-    enhanced_bookings = []
-    for booking in bookings_data:
-        # Convert all datetime fields to naive
-        for field in ['booking_date', 'payment_date', 'event__date']:
-            if field in booking:
-                booking[field] = safe_make_naive(booking[field])
-        enhanced_bookings.append(booking)
+    if stream:
+        # Rows are fetched in chunks only as an export writes them out
+        enhanced_bookings = (_naive_booking(booking) for booking in bookings_data.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+    else:
+        enhanced_bookings = [_naive_booking(booking) for booking in bookings_data]
     
-    organizer_revenue = confirmed_bookings.values(
-        'event__hostedBy__full_name', 'event__hostedBy__email'
-    ).annotate(
-        total_revenue=Sum('total_price'),
-        total_bookings=Count('booking_id'),
-        total_events=Count('event', distinct=True)
-    ).order_by('-total_revenue')
+    organizers = Users.objects.filter(user_id__in={row['organizer_id'] for row in event_totals}).in_bulk()
+    organizer_revenue = _group_revenue(event_totals, 'organizer_id', lambda organizer_id: {
+        'event__hostedBy__full_name': organizers[organizer_id].full_name,
+        'event__hostedBy__email': organizers[organizer_id].email,
+    })
     
-    category_revenue = confirmed_bookings.values(
-        'event__category__categoryName'
-    ).annotate(
-        total_revenue=Sum('total_price'),
-        total_bookings=Count('booking_id'),
-        total_events=Count('event', distinct=True)
-    ).order_by('-total_revenue')
+    categories = Category.objects.filter(categoryId__in={row['category_id'] for row in event_totals}).in_bulk()
+    category_revenue = _group_revenue(event_totals, 'category_id', lambda category_id: {
+        'event__category__categoryName': categories[category_id].categoryName,
+    })
     
-    daily_revenue = confirmed_bookings.extra(
-        select={'day': 'DATE(booking_date)'}
-    ).values('day').annotate(
-        revenue=Sum('total_price'),
-        bookings_count=Count('booking_id')
-    ).order_by('day')
+    daily_revenue = booking_series(confirmed_rollups, confirmed_bookings, 'day')
     
     return {
         'summary': summary,
         'bookings': enhanced_bookings,
-        'organizer_revenue': list(organizer_revenue),
-        'category_revenue': list(category_revenue),
-        'daily_revenue': list(daily_revenue)
+        'organizer_revenue': organizer_revenue,
+        'category_revenue': category_revenue,
+        'daily_revenue': [
+            {'day': row['day'], 'revenue': row['revenue'], 'bookings_count': row['bookings']}
+            for row in daily_revenue
+        ]
     }
 
 
+def _naive_booking(booking):
+    # Convert all datetime fields to naive
+    for field in ['booking_date', 'payment_date', 'event__date']:
+        if field in booking:
+            booking[field] = safe_make_naive(booking[field])
+    return booking
+
+
+def _group_revenue(event_totals, key, describe):
+    groups = {}
+    for row in event_totals:
+        group = groups.setdefault(row[key], {**describe(row[key]), 'total_revenue': 0, 'total_bookings': 0, 'total_events': 0})
+        group['total_revenue'] += row['revenue']
+        group['total_bookings'] += row['bookings']
+        group['total_events'] += 1
+    return sorted(groups.values(), key=lambda group: group['total_revenue'], reverse=True)
+
+
 def safe_make_naive(dt_obj):
     if dt_obj is None:
         return None
@@ -535,7 +481,7 @@ class AdminEventListView(APIView):
                     events = events.filter(is_settled_to_organizer=False, date__lt=today, on_hold=False)
             
             if search:
-                events = events.filter(Q(title__icontains=search) | Q(location__icontains=search))
+                events = search_events(events, search, ranked=False)
             
             page = paginator.paginate_queryset(events, request)
             serializer = EventDetailWithHostSerializer(page, many=True)
@@ -699,3 +645,25 @@ class AdminWalletView(APIView):
             logger.error(f"Error fetching wallet data: {e}")
             return Response({'success': False, 'message': 'An error occurred while fetching wallet data', 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+@permission_classes([IsAdminUser])
+class EmailOutboxMetricsView(APIView):
+    def get(self, request):
+        try:
+            return Response({'success': True, 'metrics': outbox_metrics()}, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.error(f"Error fetching email outbox metrics: {e}")
+            return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@permission_classes([IsAdminUser])
+class ActivityTrackerMetricsView(APIView):
+    def get(self, request):
+        # Counters belong to the process that served this request
+        return Response({'success': True, 'metrics': activity_tracker.metrics()}, status=status.HTTP_200_OK)
+
+
+@permission_classes([IsAdminUser])
+class ChatEventMetricsView(APIView):
+    def get(self, request):
+        return Response({'success': True, 'metrics': event_metrics.metrics()}, status=status.HTTP_200_OK)
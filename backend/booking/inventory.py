@@ -0,0 +1,24 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from events.models import Event
+
+
+def claim_seats(event_id, quantity=1):
+    # A single conditional UPDATE: concurrent claims queue on the row lock and each one
+    # re-checks the WHERE clause against the committed count, so the event can't oversell
+    claimed = Event.objects.filter(
+        eventId=event_id,
+        on_hold=False,
+        date__gte=timezone.now().date(),
+        ticketsSold__lte=F('ticketLimit') - quantity,
+    ).update(ticketsSold=F('ticketsSold') + quantity, updatedAt=timezone.now())
+
+    return claimed == 1
+
+
+def release_seats(event_id, quantity=1):
+    Event.objects.filter(eventId=event_id).update(
+        ticketsSold=Greatest(F('ticketsSold') - quantity, 0),
+        updatedAt=timezone.now(),
+    )
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from events.models import Event
+from booking.inventory import claim_seats, release_seats
+import statistics, threading, time
+
+
+class Command(BaseCommand):
+    help = 'Hammers one event with concurrent seat claims and verifies it is never oversold'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', help='Event to claim seats on; it must be bookable')
+        parser.add_argument('--threads', type=int, default=50)
+        parser.add_argument('--attempts', type=int, default=20, help='Claims per thread')
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(eventId=options['event_id'])
+        except (Event.DoesNotExist, ValueError):
+            raise CommandError(f"Event {options['event_id']} not found")
+
+        threads_count = options['threads']
+        attempts = options['attempts']
+        available = event.ticketLimit - event.ticketsSold
+        barrier = threading.Barrier(threads_count)
+        lock = threading.Lock()
+        latencies = []
+        claimed = [0]
+        errors = []
+
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(attempts):
+                    started = time.perf_counter()
+                    success = claim_seats(event.eventId)
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        latencies.append(elapsed)
+                        claimed[0] += int(success)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        self.stdout.write(f"Claiming {threads_count * attempts} seats from {threads_count} threads, {available} available")
+        started = time.perf_counter()
+        workers = [threading.Thread(target=worker) for _ in range(threads_count)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        total_time = time.perf_counter() - started
+
+        event.refresh_from_db()
+        sold_after = event.ticketsSold
+        # Put the inventory back the way it was so the benchmark can be re-run
+        release_seats(event.eventId, claimed[0])
+
+        if errors:
+            raise CommandError(f"{len(errors)} threads failed, first error: {errors[0]}")
+
+        latencies.sort()
+        self.stdout.write(f"Seats claimed: {claimed[0]} (expected {min(available, threads_count * attempts)})")
+        self.stdout.write(f"Tickets sold after run: {sold_after} / {event.ticketLimit}")
+        self.stdout.write(f"Throughput: {len(latencies) / total_time:.1f} claims/s over {total_time:.2f}s")
+        self.stdout.write(
+            f"Latency p50: {statistics.median(latencies) * 1000:.2f}ms, "
+            f"p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.2f}ms, "
+            f"max: {latencies[-1] * 1000:.2f}ms"
+        )
+
+        if claimed[0] > available or sold_after > event.ticketLimit:
+            raise CommandError("Event was oversold")
+        self.stdout.write(self.style.SUCCESS("No overselling detected"))
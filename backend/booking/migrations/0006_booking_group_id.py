@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_alter_booking_booking_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='group_id',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 03:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_booking_group_id'),
+        ('events', '0008_event_search_vector_event_event_search_vector_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('is_booking_cancelled', False), ('payment_status__in', ['pending', 'failed'])), fields=['booking_date'], name='booking_unpaid_expiry_idx'),
+        ),
+    ]
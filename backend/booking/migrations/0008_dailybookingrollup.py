@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-18 03:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    Booking = apps.get_model('booking', 'Booking')
+    DailyBookingRollup = apps.get_model('booking', 'DailyBookingRollup')
+
+    rows = Booking.objects.order_by().annotate(rollup_day=TruncDate('booking_date')).values(
+        'event_id', 'rollup_day', 'payment_status',
+        event_organizer=F('event__hostedBy'), event_category=F('event__category'),
+    ).annotate(booking_count=Count('booking_id'), booking_revenue=Sum('total_price'))
+    DailyBookingRollup.objects.bulk_create([
+        DailyBookingRollup(
+            day=row['rollup_day'], event_id=row['event_id'], organizer_id=row['event_organizer'],
+            category_id=row['event_category'], payment_status=row['payment_status'],
+            bookings=row['booking_count'], revenue=row['booking_revenue'] or 0,
+        )
+        for row in rows.iterator()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_booking_booking_unpaid_expiry_idx'),
+        ('categories', '0003_alter_category_created_at'),
+        ('events', '0008_event_search_vector_event_event_search_vector_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('payment_status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('cancelled', 'Cancelled'), ('failed', 'Failed'), ('refunded', 'Refunded')], max_length=20)),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('revenue', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_rollups', to='categories.category')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_rollups', to='events.event')),
+                ('organizer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organizer', 'day'], name='rollup_organizer_day_idx'), models.Index(fields=['day'], name='rollup_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('event', 'day', 'payment_status'), name='rollup_event_day_status_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+
+def release_unpaid_seat_claims(apps, schema_editor):
+    Booking = apps.get_model('booking', 'Booking')
+    Event = apps.get_model('events', 'Event')
+
+    # Unpaid bookings used to claim ticketsSold as well as their Redis hold
+    unpaid = Booking.objects.filter(payment_status__in=['pending', 'failed'], is_booking_cancelled=False)
+    for row in unpaid.order_by().values('event_id').annotate(seats=Count('booking_id')):
+        Event.objects.filter(eventId=row['event_id']).update(
+            ticketsSold=Greatest(F('ticketsSold') - row['seats'], 0)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0008_dailybookingrollup'),
+        ('events', '0008_event_search_vector_event_event_search_vector_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(release_unpaid_seat_claims, migrations.RunPython.noop),
+    ]
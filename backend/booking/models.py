@@ -6,6 +6,29 @@ import uuid
 # Create your models here.
 
 
+class BookingQuerySet(models.QuerySet):
+    # Bulk writes skip save() and its signals, so the ones that can move a booking between
+    # revenue rollup buckets refresh the affected rollup rows themselves once they commit
+    ROLLUP_FIELDS = {'payment_status', 'total_price'}
+    
+    def update(self, **kwargs):
+        if self.ROLLUP_FIELDS.isdisjoint(kwargs):
+            return super().update(**kwargs)
+        
+        from .rollups import rollup_keys, schedule_rollup_refresh
+        keys = rollup_keys(self)
+        updated = super().update(**kwargs)
+        schedule_rollup_refresh(keys)
+        return updated
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        
+        from .rollups import rollup_key, schedule_rollup_refresh
+        schedule_rollup_refresh({rollup_key(booking) for booking in objs})
+        return objs
+
+
 class Booking(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -24,14 +47,33 @@ class Booking(models.Model):
     payment_status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     is_booking_cancelled = models.BooleanField(default=False)
     payment_id = models.CharField(max_length=100, null=True, blank=True)
+    group_id = models.UUIDField(null=True, blank=True, db_index=True)
     payment_date = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = BookingQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            # Only unpaid bookings are ever scanned by the expiry sweep, so the index stays small
+            models.Index(
+                fields=['booking_date'],
+                condition=models.Q(payment_status__in=['pending', 'failed'], is_booking_cancelled=False),
+                name='booking_unpaid_expiry_idx'
+            ),
+            models.Index(fields=['updated_at'], name='booking_updated_idx'),
+        ]
+    
     def __str__(self):
         return f"Booking {self.booking_id} - {self.user.full_name} for {self.event.title}"
     
+    @property
+    def hold_id(self):
+        # Group bookings share one seat hold for the whole group
+        return self.group_id or self.booking_id
+    
     @property
     def is_confirmed(self):
         return self.status == 'confirmed'
@@ -56,3 +98,28 @@ class Booking(models.Model):
         self.status = 'refunded'
         self.save()
 
+
+
+class DailyBookingRollup(models.Model):
+    # Bookings counted per local booking day, event and payment status. Organizer and category
+    # are copied from the event so dashboards can group by them without touching bookings
+    day = models.DateField()
+    event = models.ForeignKey('events.Event', on_delete=models.CASCADE, related_name='booking_rollups')
+    organizer = models.ForeignKey('users.Users', on_delete=models.CASCADE, related_name='booking_rollups')
+    category = models.ForeignKey('categories.Category', on_delete=models.CASCADE, related_name='booking_rollups')
+    payment_status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES)
+    bookings = models.PositiveIntegerField(default=0)
+    revenue = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'day', 'payment_status'], name='rollup_event_day_status_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['organizer', 'day'], name='rollup_organizer_day_idx'),
+            models.Index(fields=['day'], name='rollup_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.event_id} {self.payment_status}: {self.bookings}"
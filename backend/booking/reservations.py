@@ -0,0 +1,160 @@
+from django.conf import settings
+from django.db import transaction
+from django_redis import get_redis_connection
+from contextlib import contextmanager
+from functools import partial
+import time
+
+
+# Per event: a mirrored count of paid seats, a sorted set of hold ids scored by their
+# expiry time and a hash with the number of seats each hold covers. Expired holds are
+# purged inside every script, so an abandoned checkout frees its seats after SEAT_HOLD_TTL
+# without waiting for a sweep. The sold mirror is re-seeded from the database hourly.
+# Unpaid seats are only ever counted here; ticketsSold in the database counts paid seats.
+SOLD_KEY_TTL = 60 * 60
+
+_PURGE_AND_COUNT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, hold_id in ipairs(expired) do
+    redis.call('HDEL', KEYS[3], hold_id)
+end
+if #expired > 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+end
+local held = 0
+for _, quantity in ipairs(redis.call('HVALS', KEYS[3])) do
+    held = held + tonumber(quantity)
+end
+"""
+
+# ARGV: now, expires_at, ticket_limit, hold_id, quantity, hold_ttl
+# Returns -1 when the sold mirror needs seeding, 1 when the hold is taken, 0 when sold out
+_RESERVE_SCRIPT = _PURGE_AND_COUNT + """
+local sold = redis.call('GET', KEYS[1])
+if not sold then
+    return -1
+end
+if redis.call('HEXISTS', KEYS[3], ARGV[4]) == 1 then
+    return 1
+end
+if tonumber(sold) + held + tonumber(ARGV[5]) > tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[4])
+redis.call('HSET', KEYS[3], ARGV[4], ARGV[5])
+redis.call('EXPIRE', KEYS[2], ARGV[6])
+redis.call('EXPIRE', KEYS[3], ARGV[6])
+return 1
+"""
+
+# ARGV: hold_id, quantity
+_CONFIRM_SCRIPT = """
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('INCRBY', KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+# ARGV: hold_id, quantity to release, empty for the whole hold
+_RELEASE_HOLD_SCRIPT = """
+local remaining = 0
+if ARGV[2] ~= '' then
+    remaining = redis.call('HINCRBY', KEYS[3], ARGV[1], -tonumber(ARGV[2]))
+end
+if remaining <= 0 then
+    redis.call('ZREM', KEYS[2], ARGV[1])
+    redis.call('HDEL', KEYS[3], ARGV[1])
+end
+return 1
+"""
+
+# ARGV: quantity
+_RELEASE_SOLD_SCRIPT = """
+local sold = redis.call('GET', KEYS[1])
+if sold then
+    redis.call('SET', KEYS[1], math.max(0, tonumber(sold) - tonumber(ARGV[1])), 'KEEPTTL')
+end
+return 1
+"""
+
+# ARGV: now
+_AVAILABLE_SCRIPT = _PURGE_AND_COUNT + """
+local sold = redis.call('GET', KEYS[1])
+if not sold then
+    return -1
+end
+return tonumber(sold) + held
+"""
+
+
+def _connection():
+    return get_redis_connection('default')
+
+
+def _keys(event_id):
+    # The hash tag keeps all keys of one event on the same Redis Cluster slot
+    prefix = f"seats:{{{event_id}}}"
+    return [f"{prefix}:sold", f"{prefix}:holds", f"{prefix}:hold_qty"]
+
+
+def _seed_sold(connection, event_id):
+    from .models import Booking
+
+    sold = Booking.objects.filter(event_id=event_id, payment_status='confirmed', is_booking_cancelled=False).count()
+    connection.set(_keys(event_id)[0], sold, ex=SOLD_KEY_TTL, nx=True)
+
+
+def _run_seeded(script, event_id, *args):
+    connection = _connection()
+    keys = _keys(event_id)
+    result = connection.eval(script, len(keys), *keys, *args)
+    if result == -1:
+        _seed_sold(connection, event_id)
+        result = connection.eval(script, len(keys), *keys, *args)
+    return result
+
+
+def reserve_seats(event, hold_id, quantity=1):
+    now = time.time()
+    hold_ttl = settings.SEAT_HOLD_TTL
+    result = _run_seeded(
+        _RESERVE_SCRIPT, event.eventId,
+        now, now + hold_ttl, event.ticketLimit, str(hold_id), quantity, hold_ttl * 2
+    )
+    return result == 1
+
+
+def confirm_seats(event_id, hold_id, quantity=1):
+    keys = _keys(event_id)
+    _connection().eval(_CONFIRM_SCRIPT, len(keys), *keys, str(hold_id), quantity)
+
+
+def release_hold(event_id, hold_id, quantity=None):
+    keys = _keys(event_id)
+    _connection().eval(_RELEASE_HOLD_SCRIPT, len(keys), *keys, str(hold_id), quantity or '')
+
+
+def release_sold_seats(event_id, quantity=1):
+    keys = _keys(event_id)
+    _connection().eval(_RELEASE_SOLD_SCRIPT, len(keys), *keys, quantity)
+
+
+@contextmanager
+def atomic_with_hold(event_id, hold_id):
+    # The booking transaction for seats already held in Redis: the hold only outlives the block
+    # if the transaction commits, a rollback or a failed commit hands it straight back
+    committed = []
+    try:
+        with transaction.atomic(durable=True):
+            transaction.on_commit(partial(committed.append, True))
+            yield
+    finally:
+        if not committed:
+            release_hold(event_id, hold_id)
+
+
+def available_seats(event):
+    taken = _run_seeded(_AVAILABLE_SCRIPT, event.eventId, time.time())
+    return max(0, event.ticketLimit - taken)
@@ -0,0 +1,205 @@
+from django.db import connection, transaction
+from django.db.models import Q, F, Sum, Count, DateField
+from django.db.models.functions import Cast, TruncDate, TruncMonth
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from functools import partial, reduce
+import operator, logging, zlib
+from .models import Booking, DailyBookingRollup
+
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_BATCH_SIZE = 500
+RECONCILE_WINDOW_DAYS = 31
+# Refreshes take a transaction-scoped advisory lock per event, hashed into a fixed number of slots
+# so a reconcile window never holds more than this many locks
+ROLLUP_LOCK_NAMESPACE = 4201
+ROLLUP_LOCK_SLOTS = 256
+
+# How each dimension a report can group by is read from a rollup row and from a raw booking
+ROLLUP_DIMENSIONS = {
+    'event_id': (F('event_id'), F('event_id')),
+    'organizer_id': (F('organizer_id'), F('event__hostedBy')),
+    'category_id': (F('category_id'), F('event__category')),
+    'payment_status': (F('payment_status'), F('payment_status')),
+    'day': (F('day'), TruncDate('booking_date')),
+    'month': (Cast(TruncMonth('day'), DateField()), Cast(TruncMonth('booking_date'), DateField())),
+}
+
+
+def rollup_key(booking):
+    return (booking.event_id, timezone.localdate(booking.booking_date))
+
+
+def rollup_keys(bookings_qs):
+    return set(
+        bookings_qs.order_by().annotate(rollup_day=TruncDate('booking_date'))
+        .values_list('event_id', 'rollup_day').distinct()
+    )
+
+
+def schedule_rollup_refresh(keys):
+    if keys:
+        transaction.on_commit(partial(_refresh_after_commit, frozenset(keys)))
+
+
+def _refresh_after_commit(keys):
+    # A failed refresh must not fail the booking write; the nightly reconcile repairs the rows
+    try:
+        refresh_rollups(keys)
+    except Exception as e:
+        logger.error(f"Error refreshing booking rollups for {len(keys)} keys: {e}")
+
+
+def refresh_rollups(keys):
+    # Touched (event, day) rows are recomputed from their bookings instead of being shifted by
+    # deltas. Refreshes of one event are serialized and each reads after taking the lock, so the
+    # last one to run has seen every booking committed before it started
+    keys = set(keys)
+    if not keys:
+        return 0
+
+    matches = []
+    for event_id, day in keys:
+        start, end = _day_bounds(day, day)
+        matches.append(Q(event_id=event_id, booking_date__gte=start, booking_date__lt=end))
+    scope = reduce(operator.or_, [Q(event_id=event_id, day=day) for event_id, day in keys])
+    return _write_rollups(Booking.objects.filter(reduce(operator.or_, matches)), scope, {event_id for event_id, _ in keys})
+
+
+def reconcile_rollups(start_day=None, end_day=None):
+    # Rebuilds every rollup row in the range one window at a time, catching anything an
+    # incremental refresh missed. Without a start day the whole booking history is rebuilt
+    end_day = end_day or timezone.localdate()
+    if start_day is None:
+        first_booking = Booking.objects.order_by('booking_date').values_list('booking_date', flat=True).first()
+        start_day = timezone.localdate(first_booking) if first_booking else end_day
+        DailyBookingRollup.objects.filter(day__lt=start_day).delete()
+
+    written = 0
+    window_start = start_day
+    while window_start <= end_day:
+        window_end = min(window_start + timedelta(days=RECONCILE_WINDOW_DAYS - 1), end_day)
+        start, end = _day_bounds(window_start, window_end)
+        written += _write_rollups(
+            Booking.objects.filter(booking_date__gte=start, booking_date__lt=end),
+            Q(day__gte=window_start, day__lte=window_end),
+        )
+        window_start = window_end + timedelta(days=1)
+    return written
+
+
+def _write_rollups(bookings_qs, scope, event_ids=None):
+    with transaction.atomic():
+        if event_ids is None:
+            event_ids = set(bookings_qs.order_by().values_list('event_id', flat=True).distinct())
+            event_ids.update(DailyBookingRollup.objects.filter(scope).values_list('event_id', flat=True).distinct())
+        _lock_events(event_ids)
+        return _upsert_rollups(bookings_qs, scope)
+
+
+def _lock_events(event_ids):
+    # Held until the surrounding transaction ends, around both the read and the upsert. Slots are
+    # taken in a fixed order so two refreshes can't deadlock
+    if connection.vendor != 'postgresql':
+        return
+    slots = sorted({zlib.crc32(str(event_id).encode()) % ROLLUP_LOCK_SLOTS for event_id in event_ids})
+    with connection.cursor() as cursor:
+        for slot in slots:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [ROLLUP_LOCK_NAMESPACE, slot])
+
+
+def _upsert_rollups(bookings_qs, scope):
+    rows = bookings_qs.order_by().annotate(rollup_day=TruncDate('booking_date')).values(
+        'event_id', 'rollup_day', 'payment_status',
+        event_organizer=F('event__hostedBy'), event_category=F('event__category'),
+    ).annotate(booking_count=Count('booking_id'), booking_revenue=Sum('total_price'))
+
+    rollups = [
+        DailyBookingRollup(
+            day=row['rollup_day'],
+            event_id=row['event_id'],
+            organizer_id=row['event_organizer'],
+            category_id=row['event_category'],
+            payment_status=row['payment_status'],
+            bookings=row['booking_count'],
+            revenue=row['booking_revenue'] or 0,
+        )
+        for row in rows
+    ]
+    present = {(rollup.event_id, rollup.day, rollup.payment_status) for rollup in rollups}
+
+    DailyBookingRollup.objects.bulk_create(
+        rollups,
+        batch_size=ROLLUP_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['event', 'day', 'payment_status'],
+        update_fields=['organizer', 'category', 'bookings', 'revenue', 'updated_at'],
+    )
+    # Buckets whose last booking moved to another status are dropped
+    stale = [
+        pk for pk, event_id, day, payment_status in DailyBookingRollup.objects.filter(scope)
+        .values_list('pk', 'event_id', 'day', 'payment_status')
+        if (event_id, day, payment_status) not in present
+    ]
+    DailyBookingRollup.objects.filter(pk__in=stale).delete()
+
+    return len(rollups)
+
+
+def booking_totals(rollups_qs, bookings_qs, dimensions):
+    # Days before today are read from the rollups and today straight from the bookings, in a
+    # single UNION; both querysets must already carry the same filters
+    today = timezone.localdate()
+    today_start, _ = _day_bounds(today, today)
+    aliases = [f'dimension_{index}' for index in range(len(dimensions))]
+
+    rolled = rollups_qs.filter(day__lt=today).order_by().annotate(**{
+        alias: ROLLUP_DIMENSIONS[dimension][0] for alias, dimension in zip(aliases, dimensions)
+    }).values(*aliases).annotate(total_bookings=Sum('bookings'), total_revenue=Sum('revenue'))
+    live = bookings_qs.filter(booking_date__gte=today_start).order_by().annotate(**{
+        alias: ROLLUP_DIMENSIONS[dimension][1] for alias, dimension in zip(aliases, dimensions)
+    }).values(*aliases).annotate(total_bookings=Count('booking_id'), total_revenue=Sum('total_price'))
+
+    totals = {}
+    for row in rolled.union(live, all=True):
+        key = tuple(row[alias] for alias in aliases)
+        entry = totals.setdefault(key, {**dict(zip(dimensions, key)), 'bookings': 0, 'revenue': 0})
+        entry['bookings'] += row['total_bookings'] or 0
+        entry['revenue'] += int(row['total_revenue'] or 0)
+    return list(totals.values())
+
+
+def booking_series(rollups_qs, bookings_qs, period, start_day=None, end_day=None):
+    # Totals per day or month in one query. With both ends given every bucket in between is
+    # returned, empty ones as zeros, so charts don't have to fill the gaps themselves. Monthly
+    # series start on the first of the month, so the first bucket holds the whole month
+    if start_day and period == 'month':
+        start_day = start_day.replace(day=1)
+    if start_day:
+        rollups_qs = rollups_qs.filter(day__gte=start_day)
+        bookings_qs = bookings_qs.filter(booking_date__gte=_day_bounds(start_day, start_day)[0])
+    if end_day:
+        rollups_qs = rollups_qs.filter(day__lte=end_day)
+        bookings_qs = bookings_qs.filter(booking_date__lt=_day_bounds(end_day, end_day)[1])
+
+    totals = {row[period]: row for row in booking_totals(rollups_qs, bookings_qs, [period])}
+    if not (start_day and end_day):
+        return [totals[bucket] for bucket in sorted(totals)]
+
+    series = []
+    bucket = start_day
+    while bucket <= end_day:
+        series.append(totals.get(bucket, {period: bucket, 'bookings': 0, 'revenue': 0}))
+        if period == 'month':
+            bucket = (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            bucket += timedelta(days=1)
+    return series
+
+
+def _day_bounds(first_day, last_day):
+    start = timezone.make_aware(datetime.combine(first_day, time.min))
+    end = timezone.make_aware(datetime.combine(last_day + timedelta(days=1), time.min))
+    return start, end
@@ -14,7 +14,7 @@ class UserBookingSerializer(serializers.ModelSerializer):
         fields = [
             'booking_id', 'user', 'event', 'booking_name', 'total_price',
             'booking_date', 'payment_status', 'is_booking_cancelled',
-            'payment_id', 'payment_date', 'notes', 'created_at',
+            'payment_id', 'payment_date', 'group_id', 'notes', 'created_at',
             'can_download_ticket', 'can_cancel'
         ]
     
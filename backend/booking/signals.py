@@ -0,0 +1,28 @@
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from events.models import Event
+from .models import Booking, BookingQuerySet, DailyBookingRollup
+from .rollups import rollup_key, schedule_rollup_refresh
+
+
+@receiver(post_save, sender=Booking)
+def refresh_rollup_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields and BookingQuerySet.ROLLUP_FIELDS.isdisjoint(update_fields):
+        return
+    schedule_rollup_refresh({rollup_key(instance)})
+
+
+@receiver(post_delete, sender=Booking)
+def refresh_rollup_on_delete(sender, instance, **kwargs):
+    schedule_rollup_refresh({rollup_key(instance)})
+
+
+@receiver(post_save, sender=Event)
+def sync_rollup_event_owner(sender, instance, created, **kwargs):
+    # Rollups copy the event's organizer and category, so a moved event carries its history along
+    if created:
+        return
+    DailyBookingRollup.objects.filter(event=instance).exclude(
+        Q(organizer_id=instance.hostedBy_id) & Q(category_id=instance.category_id)
+    ).update(organizer_id=instance.hostedBy_id, category_id=instance.category_id)
@@ -0,0 +1,20 @@
+from celery import shared_task
+from django.utils import timezone
+from datetime import timedelta
+import time
+from .rollups import reconcile_rollups
+
+
+RECONCILE_LOOKBACK_DAYS = 35
+
+
+@shared_task
+def reconcile_booking_rollups(days=RECONCILE_LOOKBACK_DAYS):
+    started = time.monotonic()
+    # The incremental refreshes keep the rollups current, so the nightly run only re-checks the
+    # last few weeks; days=None rebuilds the whole history when run by hand
+    start_day = timezone.localdate() - timedelta(days=days) if days is not None else None
+    written = reconcile_rollups(start_day=start_day)
+    
+    elapsed = time.monotonic() - started
+    return f"Reconciled {written} booking rollup rows in {elapsed:.2f}s"
@@ -1,3 +1,102 @@
 from django.test import TestCase
+from django.utils import timezone
+from datetime import date, time, timedelta
+from users.models import Users
+from categories.models import Category
+from events.models import Event
+from .models import Booking, DailyBookingRollup
+from .inventory import claim_seats, release_seats
+from .rollups import booking_totals, reconcile_rollups
 
-# Create your tests here.
+
+class SeatInventoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = Users.objects.create_user(email='host@example.com', password='pass', full_name='Host', mobile=9000000001, role='organizer')
+        cls.music = Category.objects.create(categoryName='Music')
+        cls.concert = Event.objects.create(
+            title='Concert', category=cls.music, pricePerTicket=500, ticketLimit=3, ticketsSold=1,
+            hostedBy=cls.organizer, description='Live music', date=date.today() + timedelta(days=7), time=time(18, 0)
+        )
+
+    def _sold(self):
+        self.concert.refresh_from_db()
+        return self.concert.ticketsSold
+
+    def test_claim_past_the_limit_is_refused(self):
+        self.assertTrue(claim_seats(self.concert.eventId, 2))
+        self.assertEqual(self._sold(), 3)
+
+        self.assertFalse(claim_seats(self.concert.eventId))
+        self.assertEqual(self._sold(), 3)
+
+    def test_partial_claim_is_all_or_nothing(self):
+        self.assertFalse(claim_seats(self.concert.eventId, 3))
+        self.assertEqual(self._sold(), 1)
+
+    def test_release_never_goes_below_zero(self):
+        release_seats(self.concert.eventId, 5)
+        self.assertEqual(self._sold(), 0)
+
+
+class BookingRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = Users.objects.create_user(email='host@example.com', password='pass', full_name='Host', mobile=9000000001, role='organizer')
+        cls.customer = Users.objects.create_user(email='guest@example.com', password='pass', full_name='Guest', mobile=9000000002)
+        cls.music = Category.objects.create(categoryName='Music')
+        cls.concert = Event.objects.create(
+            title='Concert', category=cls.music, pricePerTicket=500, ticketLimit=100,
+            hostedBy=cls.organizer, description='Live music', date=date.today() + timedelta(days=7), time=time(18, 0)
+        )
+
+    def _book(self, payment_status='confirmed', price=500):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(user=self.customer, event=self.concert, booking_name='Guest', total_price=price, payment_status=payment_status)
+
+    def _buckets(self):
+        return {row.payment_status: (row.bookings, row.revenue) for row in DailyBookingRollup.objects.filter(event=self.concert)}
+
+    def test_status_change_moves_the_booking_between_buckets(self):
+        booking = self._book('pending')
+        self.assertEqual(self._buckets(), {'pending': (1, 500)})
+
+        booking.payment_status = 'confirmed'
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(self._buckets(), {'confirmed': (1, 500)})
+
+    def test_queryset_update_schedules_a_refresh(self):
+        self._book('confirmed')
+        self._book('confirmed')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Booking.objects.update(notes='VIP')
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Booking.objects.filter(event=self.concert).update(payment_status='refunded')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self._buckets(), {'refunded': (2, 1000)})
+
+    def test_totals_combine_past_rollups_with_todays_bookings(self):
+        past = self._book('confirmed', 500)
+        Booking.objects.filter(pk=past.pk).update(booking_date=timezone.now() - timedelta(days=3))
+        reconcile_rollups()
+        self._book('confirmed', 300)
+
+        bookings_qs = Booking.objects.filter(payment_status='confirmed')
+        rollups_qs = DailyBookingRollup.objects.filter(payment_status='confirmed')
+        self.assertEqual(booking_totals(rollups_qs, bookings_qs, ['event_id']), [
+            {'event_id': self.concert.eventId, 'bookings': 2, 'revenue': 800},
+        ])
+
+        days = {row['day']: row['bookings'] for row in booking_totals(rollups_qs, bookings_qs, ['day'])}
+        self.assertEqual(days, {timezone.localdate() - timedelta(days=3): 1, timezone.localdate(): 1})
+
+    def test_reconcile_rebuilds_a_missing_row(self):
+        self._book('confirmed')
+        DailyBookingRollup.objects.all().delete()
+
+        reconcile_rollups()
+        self.assertEqual(self._buckets(), {'confirmed': (1, 500)})
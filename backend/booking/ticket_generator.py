@@ -2,7 +2,7 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
 from reportlab.lib.colors import HexColor
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
 from reportlab.lib.enums import TA_CENTER
 import qrcode, io
 from .ticket_config import COLORS, FONTS, LAYOUT, QR_CONFIG, TICKET_CONTENT
@@ -79,6 +79,9 @@ class TicketGenerator:
         )
     
     def generate_ticket_pdf(self, booking):
+        return self.generate_group_ticket_pdf([booking])
+    
+    def generate_group_ticket_pdf(self, bookings):
         buffer = io.BytesIO()
         
         # Create PDF document
@@ -91,11 +94,15 @@ class TicketGenerator:
             bottomMargin=LAYOUT['page_margins']*inch
         )
         
+        # One page per ticket so each one can be scanned on its own
         story = []
-        story.extend(self._create_title_section())
-        story.extend(self._create_main_content_section(booking))
-        story.extend(self._create_booking_info_section(booking))
-        story.extend(self._create_footer_section())
+        for index, booking in enumerate(bookings):
+            if index:
+                story.append(PageBreak())
+            story.extend(self._create_title_section())
+            story.extend(self._create_main_content_section(booking))
+            story.extend(self._create_booking_info_section(booking))
+            story.extend(self._create_footer_section())
         doc.build(story)
         buffer.seek(0)
         
@@ -6,16 +6,20 @@ from rest_framework.decorators import permission_classes
 from django.db import transaction
 from django.utils import timezone
 from django.http import HttpResponse
-import logging
+import logging, uuid
 from wallet.models import Wallet, WalletTransaction
 from events.models import Event
 from coupon.models import Coupon, CouponUsage
+from payments.views import leave_payment_intent
 from .ticket_generator import TicketGenerator, TicketPermissions
+from .inventory import claim_seats, release_seats
+from .reservations import atomic_with_hold, reserve_seats, confirm_seats, release_hold, release_sold_seats
 from .models import Booking
 from .serializers import UserBookingSerializer
 
 
 logger = logging.getLogger(__name__)
+MAX_TICKETS_PER_BOOKING = 10
 
 @permission_classes([IsAuthenticated])
 class BookEventView(APIView):
@@ -36,52 +40,65 @@ class BookEventView(APIView):
                 return Response({"error": "Sorry, this event is currently not available."}, status=status.HTTP_403_FORBIDDEN)
             if event.date < timezone.now().date():
                 return Response({"error": "Sorry, this event has already taken place."}, status=status.HTTP_400_BAD_REQUEST)
-            if event.ticketsSold >= event.ticketLimit:
+            # Card payments keep the seat on a short Redis hold until Stripe confirms them, only
+            # paid seats are claimed in ticketsSold
+            booking_id = uuid.uuid4()
+            if not reserve_seats(event, booking_id):
                 return Response({"error": "Sorry, this event is sold out"}, status=status.HTTP_400_BAD_REQUEST)
-            if coupon_code:
-                coupon = Coupon.objects.filter(code=coupon_code, is_active=True).first()
-                total_price = event.pricePerTicket - coupon.discount_amount
-
-                try:
-                    CouponUsage.objects.create(user=request.user, coupon=coupon, eventId=event)
-                except Exception as e:
-                    logger.error(f"Error applying coupon: {e}")
-                    return Response({"error": "Error applying coupon!"}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                total_price = event.pricePerTicket
-            
-            if payment_method == 'wallet':
-                wallet = Wallet.objects.get(user=request.user)
-                if wallet.balance < total_price:
-                    return Response({"error": "Insufficient wallet balance"}, status=status.HTTP_400_BAD_REQUEST)
-                
-                wallet.balance -= total_price
-                wallet.save()
-                WalletTransaction.objects.create(
-                    wallet=wallet,
-                    amount=total_price,
-                    transaction_type='DEBIT',
-                )
-                booking = Booking.objects.create(
-                    event=event,
-                    user=request.user,
-                    booking_name=booking_name,
-                    total_price=total_price,
-                    payment_status='confirmed',
-                    notes=notes
-                )
-            else:
-                booking = Booking.objects.create(
-                    event=event,
-                    user=request.user,
-                    booking_name=booking_name,
-                    total_price=total_price,
-                    payment_status='pending',
-                    notes=notes
-                )
-            
-            event.ticketsSold += 1
-            event.save()
+            with atomic_with_hold(event.eventId, booking_id):
+                # Seat claim, coupon usage, wallet debit and booking insert commit or roll back together
+                if coupon_code:
+                    coupon = Coupon.objects.filter(code=coupon_code, is_active=True).first()
+                    total_price = event.pricePerTicket - coupon.discount_amount
+
+                    try:
+                        with transaction.atomic():
+                            CouponUsage.objects.create(user=request.user, coupon=coupon, eventId=event)
+                    except Exception as e:
+                        logger.error(f"Error applying coupon: {e}")
+                        transaction.set_rollback(True)
+                        return Response({"error": "Error applying coupon!"}, status=status.HTTP_400_BAD_REQUEST)
+                else:
+                    total_price = event.pricePerTicket
+
+                if payment_method == 'wallet':
+                    if not claim_seats(event.eventId):
+                        transaction.set_rollback(True)
+                        return Response({"error": "Sorry, this event is sold out"}, status=status.HTTP_400_BAD_REQUEST)
+
+                    wallet = Wallet.objects.select_for_update().get(user=request.user)
+                    if wallet.balance < total_price:
+                        transaction.set_rollback(True)
+                        return Response({"error": "Insufficient wallet balance"}, status=status.HTTP_400_BAD_REQUEST)
+
+                    wallet.balance -= total_price
+                    wallet.save()
+                    WalletTransaction.objects.create(
+                        wallet=wallet,
+                        amount=total_price,
+                        transaction_type='DEBIT',
+                    )
+                    booking = Booking.objects.create(
+                        booking_id=booking_id,
+                        event=event,
+                        user=request.user,
+                        booking_name=booking_name,
+                        total_price=total_price,
+                        payment_status='confirmed',
+                        notes=notes
+                    )
+                    transaction.on_commit(lambda: confirm_seats(event.eventId, booking_id))
+                else:
+                    booking = Booking.objects.create(
+                        booking_id=booking_id,
+                        event=event,
+                        user=request.user,
+                        booking_name=booking_name,
+                        total_price=total_price,
+                        payment_status='pending',
+                        notes=notes
+                    )
+
             serializer = UserBookingSerializer(booking)
 
             return Response({"message": "Booking successful", "booking": serializer.data}, status=status.HTTP_201_CREATED)
@@ -93,6 +110,105 @@ class BookEventView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@permission_classes([IsAuthenticated])
+class GroupBookEventView(APIView):
+    def post(self, request):
+        event_id = request.data.get('event_id')
+        booking_name = request.data.get('booking_name')
+        coupon_code = request.data.get('coupon_code')
+        notes = request.data.get('notes')
+        payment_method = request.data.get('payment_method')
+        
+        try:
+            quantity = int(request.data.get('quantity', 1))
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid ticket quantity"}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= quantity <= MAX_TICKETS_PER_BOOKING:
+            return Response({"error": f"You can book between 1 and {MAX_TICKETS_PER_BOOKING} tickets at a time"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not booking_name:
+            booking_name = request.user.full_name
+        
+        try:
+            event = Event.objects.get(eventId=event_id)
+            
+            if event.on_hold:
+                return Response({"error": "Sorry, this event is currently not available."}, status=status.HTTP_403_FORBIDDEN)
+            if event.date < timezone.now().date():
+                return Response({"error": "Sorry, this event has already taken place."}, status=status.HTTP_400_BAD_REQUEST)
+            
+            group_id = uuid.uuid4()
+            if not reserve_seats(event, group_id, quantity):
+                return Response({"error": "Sorry, not enough tickets are left for this event"}, status=status.HTTP_400_BAD_REQUEST)
+            with atomic_with_hold(event.eventId, group_id):
+                # A coupon can be used once per user, so its discount applies to one ticket of the group
+                ticket_prices = [event.pricePerTicket] * quantity
+                if coupon_code:
+                    coupon = Coupon.objects.filter(code=coupon_code, is_active=True).first()
+                    ticket_prices[0] = event.pricePerTicket - coupon.discount_amount
+                    
+                    try:
+                        with transaction.atomic():
+                            CouponUsage.objects.create(user=request.user, coupon=coupon, eventId=event)
+                    except Exception as e:
+                        logger.error(f"Error applying coupon: {e}")
+                        transaction.set_rollback(True)
+                        return Response({"error": "Error applying coupon!"}, status=status.HTTP_400_BAD_REQUEST)
+                total_price = sum(ticket_prices)
+                
+                if payment_method == 'wallet':
+                    if not claim_seats(event.eventId, quantity):
+                        transaction.set_rollback(True)
+                        return Response({"error": "Sorry, not enough tickets are left for this event"}, status=status.HTTP_400_BAD_REQUEST)
+                    
+                    wallet = Wallet.objects.select_for_update().get(user=request.user)
+                    if wallet.balance < total_price:
+                        transaction.set_rollback(True)
+                        return Response({"error": "Insufficient wallet balance"}, status=status.HTTP_400_BAD_REQUEST)
+                    
+                    wallet.balance -= total_price
+                    wallet.save()
+                    WalletTransaction.objects.create(
+                        wallet=wallet,
+                        amount=total_price,
+                        transaction_type='DEBIT',
+                    )
+                    payment_status = 'confirmed'
+                else:
+                    payment_status = 'pending'
+                
+                bookings = Booking.objects.bulk_create([
+                    Booking(
+                        event=event,
+                        user=request.user,
+                        booking_name=booking_name,
+                        total_price=price,
+                        payment_status=payment_status,
+                        group_id=group_id,
+                        notes=notes
+                    )
+                    for price in ticket_prices
+                ])
+                
+                if payment_status == 'confirmed':
+                    transaction.on_commit(lambda: confirm_seats(event.eventId, group_id, quantity))
+            
+            serializer = UserBookingSerializer(bookings, many=True)
+            
+            return Response({
+                "message": "Booking successful",
+                "group_id": group_id,
+                "total_price": total_price,
+                "bookings": serializer.data
+            }, status=status.HTTP_201_CREATED)
+        except Event.DoesNotExist:
+            logger.error(f"Event with ID {event_id} not found")
+            return Response({"error": "Event not found"}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.error(f"Error occurred while creating group booking: {e}")
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @permission_classes([IsAuthenticated])
 class BookingDetailView(APIView):
     def get(self, request, booking_id):
@@ -124,8 +240,10 @@ class CancelBookingView(APIView):
     def patch(self, request, booking_id):
         try:
             with transaction.atomic():
-                booking = Booking.objects.get(pk=booking_id, user=request.user)
+                booking = Booking.objects.select_for_update().get(pk=booking_id, user=request.user)
                 
+                if booking.is_booking_cancelled:
+                    return Response({"error": "This booking is already cancelled"}, status=status.HTTP_400_BAD_REQUEST)
                 if booking.event.date < timezone.now().date() or booking.event.is_completed:
                     return Response({"error": "Cannot cancel bookings for completed events"}, status=status.HTTP_400_BAD_REQUEST)
                 if not booking.event.cancellationAvailable:
@@ -143,16 +261,17 @@ class CancelBookingView(APIView):
                     wallet.balance += booking.total_price
                     wallet.save()
                     booking.payment_status = 'refunded'
+                    release_seats(booking.event_id)
+                    transaction.on_commit(lambda: release_sold_seats(booking.event_id))
                 else:
+                    if booking.payment_id and not leave_payment_intent(booking):
+                        return Response({"error": "Payment for this booking is already being processed"}, status=status.HTTP_409_CONFLICT)
                     booking.payment_status = 'cancelled'
+                    transaction.on_commit(lambda: release_hold(booking.event_id, booking.hold_id, 1))
                 
                 booking.is_booking_cancelled = True
                 booking.save()
                 
-                event = booking.event
-                event.ticketsSold = max(0, event.ticketsSold - 1)
-                event.save()
-                
                 serializer = UserBookingSerializer(booking)
                 
                 return Response({"success": True, "message": "Booking cancelled successfully", "booking": serializer.data}, status=status.HTTP_200_OK)
@@ -189,3 +308,30 @@ class DownloadTicketView(APIView):
             logger.error(f"Error generating ticket for booking {booking_id}: {e}")
             return Response({"error": f"Error generating ticket: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+@permission_classes([IsAuthenticated])
+class DownloadGroupTicketsView(APIView):
+    def get(self, request, group_id):
+        try:
+            bookings = list(Booking.objects.select_related(
+                'event', 'user', 'event__hostedBy', 'event__category'
+            ).filter(group_id=group_id, user=request.user).order_by('booking_id'))
+            if not bookings:
+                logger.error(f"Booking group {group_id} not found for user {request.user.id}")
+                return Response({"error": "Booking not found or does not belong to you"}, status=status.HTTP_404_NOT_FOUND)
+            
+            # Cancelled tickets are left out, the rest of the group still downloads
+            permission_checks = [TicketPermissions.can_download_ticket(booking) for booking in bookings]
+            downloadable = [booking for booking, check in zip(bookings, permission_checks) if check["allowed"]]
+            if not downloadable:
+                return Response({"error": permission_checks[0]["reason"]}, status=status.HTTP_400_BAD_REQUEST)
+            
+            ticket_generator = TicketGenerator()
+            pdf_buffer = ticket_generator.generate_group_ticket_pdf(downloadable)
+            response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
+            response['Content-Disposition'] = f'attachment; filename="tickets_{group_id}.pdf"'
+            
+            return response
+        except Exception as e:
+            logger.error(f"Error generating tickets for booking group {group_id}: {e}")
+            return Response({"error": f"Error generating tickets: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -11,6 +11,7 @@ class Category(models.Model):
     image = models.CharField(max_length=255, blank=True, null=True)
     is_listed = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.categoryName
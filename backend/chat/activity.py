@@ -0,0 +1,113 @@
+from django.db import close_old_connections
+from django.db.models import Case, When, Value, F, DateTimeField
+from django.db.models.functions import Greatest
+from datetime import datetime, timezone
+import atexit, logging, os, threading, time
+from users.models import Users
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_FLUSH_INTERVAL = 5
+ACTIVITY_MAX_PENDING = 10000
+ACTIVITY_FLUSH_BATCH_SIZE = 500
+
+
+class ActivityTracker:
+    # Coalesces request activity per user in memory and writes it with one bulk UPDATE
+    # every few seconds, so busy users cost one row write per interval instead of per request
+    def __init__(self, flush_interval=ACTIVITY_FLUSH_INTERVAL, max_pending=ACTIVITY_MAX_PENDING):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._stats = {
+            'flushes': 0,
+            'rows_flushed': 0,
+            'dropped': 0,
+            'last_flush_seconds': 0.0,
+            'max_flush_seconds': 0.0,
+            'total_flush_seconds': 0.0,
+        }
+
+    def record(self, user_id, timestamp=None):
+        self._ensure_worker()
+        timestamp = timestamp or time.time()
+        with self._lock:
+            if user_id not in self._pending and len(self._pending) >= self.max_pending:
+                # Full buffer: drop rather than block the request, and flush early
+                self._stats['dropped'] += 1
+                self._wakeup.set()
+                return
+            self._pending[user_id] = max(timestamp, self._pending.get(user_id, 0))
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        started = time.monotonic()
+        items = list(pending.items())
+        try:
+            close_old_connections()
+            for index in range(0, len(items), ACTIVITY_FLUSH_BATCH_SIZE):
+                batch = items[index:index + ACTIVITY_FLUSH_BATCH_SIZE]
+                seen_at = Case(
+                    *[When(user_id=user_id, then=Value(datetime.fromtimestamp(timestamp, tz=timezone.utc)))
+                      for user_id, timestamp in batch],
+                    output_field=DateTimeField()
+                )
+                # Other writers (presence flushes, other workers' trackers) may already hold a newer time
+                Users.objects.filter(user_id__in=[user_id for user_id, _ in batch]).update(
+                    last_seen=Greatest(F('last_seen'), seen_at), last_activity=Greatest(F('last_activity'), seen_at)
+                )
+        except Exception as e:
+            logger.error(f"Error flushing user activity: {e}")
+            # Put the timestamps back so the next flush retries them, keeping any newer ones
+            with self._lock:
+                for user_id, timestamp in items:
+                    if user_id in self._pending or len(self._pending) < self.max_pending:
+                        self._pending[user_id] = max(timestamp, self._pending.get(user_id, 0))
+            return 0
+
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._stats['flushes'] += 1
+            self._stats['rows_flushed'] += len(items)
+            self._stats['last_flush_seconds'] = elapsed
+            self._stats['max_flush_seconds'] = max(self._stats['max_flush_seconds'], elapsed)
+            self._stats['total_flush_seconds'] += elapsed
+        return len(items)
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        stats['avg_flush_seconds'] = stats['total_flush_seconds'] / stats['flushes'] if stats['flushes'] else 0.0
+        stats['pid'] = os.getpid()
+        return stats
+
+    def _ensure_worker(self):
+        # Started lazily and per process, so forked server workers each get their own thread
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='activity-tracker', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+activity_tracker = ActivityTracker()
+atexit.register(activity_tracker.flush)
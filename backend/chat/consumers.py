@@ -1,17 +1,35 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
+from django.core.exceptions import ValidationError
 from django.utils import timezone
-from django.contrib.auth import get_user_model
-import json
+import asyncio, json, logging
+from . import presence
+from .models import ChatParticipant
+from .throttle import TypingThrottle, event_metrics, PRESENCE_OFFLINE_GRACE
+from .message_writer import message_writer, MessageRejected
 
 
-User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Keeps delayed presence broadcasts referenced until they finish
+_pending_broadcasts = set()
+
 
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.room_id = self.scope['url_route']['kwargs']['room_id']
         self.room_group_name = f'chat_{self.room_id}'
         self.user_id = None
+        self.typing_throttle = TypingThrottle()
+        
+        # Only members of the room get a socket, and everything sent on it is attributed to the
+        # user JWTAuthMiddleware resolved, never to an id the client puts in the payload
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated or not await self.is_participant(user):
+            await self.close()
+            return
+        self.sender_id = str(user.user_id)
         
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
@@ -24,7 +42,10 @@ class ChatConsumer(AsyncWebsocketConsumer):
     async def disconnect(self, close_code):
         if self.user_id:
             await self.update_user_status(self.user_id, False)
-            await self.broadcast_user_status(self.user_id, False)
+            # Announced after a grace period so a page reload doesn't flash offline then online
+            task = asyncio.create_task(self.broadcast_user_status_later(self.user_id, PRESENCE_OFFLINE_GRACE))
+            _pending_broadcasts.add(task)
+            task.add_done_callback(_pending_broadcasts.discard)
         
         await self.channel_layer.group_discard(
             self.room_group_name,
@@ -37,28 +58,24 @@ class ChatConsumer(AsyncWebsocketConsumer):
             message_type = text_data_json.get('type')
             
             if message_type == 'user_connected':
-                user_id = text_data_json.get('user_id')
-                if user_id:
-                    self.user_id = user_id
-                    await self.update_user_status(user_id, True)
-                    await self.broadcast_user_status(user_id, True)
+                self.user_id = self.sender_id
+                await self.update_user_status(self.user_id, True)
+                await self.broadcast_user_status(self.user_id, True)
                     
             elif message_type == 'typing':
-                user_id = text_data_json.get('user_id')
-                if user_id:
+                is_typing = bool(text_data_json.get('is_typing', False))
+                if self.typing_throttle.should_send(self.sender_id, is_typing):
                     await self.channel_layer.group_send(
                         self.room_group_name,
                         {
                             'type': 'typing_indicator',
-                            'user_id': user_id,
-                            'is_typing': text_data_json.get('is_typing', False)
+                            'user_id': self.sender_id,
+                            'is_typing': is_typing
                         }
                     )
                     
             elif message_type == 'ping':
-                user_id = text_data_json.get('user_id')
-                if user_id:
-                    await self.update_last_activity(user_id)
+                await self.update_last_activity(self.sender_id)
                     
                 await self.send(text_data=json.dumps({
                     'type': 'pong',
@@ -67,18 +84,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 
             elif message_type == 'message':
                 content = text_data_json.get('content', '').strip()
-                sender_id = text_data_json.get('user_id')
-                if content and sender_id:
-                    await self.update_last_activity(sender_id)
-                    message = await self.create_message(content, sender_id)
-                    if message:
-                        await self.channel_layer.group_send(
-                            self.room_group_name,
-                            {
-                                'type': 'chat_message',
-                                'message': message
-                            }
-                        )
+                if content:
+                    await self.update_last_activity(self.sender_id)
+                    await self.create_message(content, self.sender_id, text_data_json.get('client_id'))
         except json.JSONDecodeError:
             print("Invalid JSON received")
         except Exception as e:
@@ -94,6 +102,14 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'is_typing': event['is_typing']
         }))
     
+    async def messages_read(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'read_receipt',
+            'user_id': event['user_id'],
+            'last_read_message_id': event['last_read_message_id'],
+            'last_read_at': event['last_read_at']
+        }))
+    
     async def user_status_update(self, event):
         await self.send(text_data=json.dumps({
             'type': 'user_status',
@@ -104,34 +120,42 @@ class ChatConsumer(AsyncWebsocketConsumer):
         }))
     
     @database_sync_to_async
-    def update_user_status(self, user_id, is_online):
+    def is_participant(self, user):
         try:
-            user = User.objects.get(user_id=user_id)
-            user.set_online_status(is_online)
-            return True
-        except User.DoesNotExist:
+            return ChatParticipant.objects.filter(room_id=self.room_id, user=user).exists()
+        except ValidationError:
             return False
     
-    @database_sync_to_async
+    @sync_to_async(thread_sensitive=False)
+    def update_user_status(self, user_id, is_online):
+        if is_online:
+            presence.mark_online(user_id)
+        else:
+            presence.mark_offline(user_id)
+        return True
+    
+    @sync_to_async(thread_sensitive=False)
     def update_last_activity(self, user_id):
-        try:
-            user = User.objects.get(user_id=user_id)
-            user.update_last_seen()
-            return True
-        except User.DoesNotExist:
-            return False
+        presence.heartbeat(user_id)
+        return True
     
-    @database_sync_to_async
+    @sync_to_async(thread_sensitive=False)
     def get_user_status(self, user_id):
-        try:
-            user = User.objects.get(user_id=user_id)
-            return {
-                'is_online': user.is_online,
-                'status_text': user.get_online_status(),
-                'last_seen': user.last_seen.isoformat() if user.last_seen else None
-            }
-        except User.DoesNotExist:
+        status_info = presence.get_presence([user_id]).get(str(user_id))
+        if not status_info or not status_info['last_seen']:
+            return None
+        
+        # Only a status the room hasn't been told about yet is worth a group_send
+        delivered = presence.claim_presence_broadcast(self.room_id, user_id, status_info['is_online'])
+        event_metrics.record('presence', delivered)
+        if not delivered:
             return None
+        
+        return {
+            'is_online': status_info['is_online'],
+            'status_text': presence.get_status_text(status_info['is_online'], status_info['last_seen']),
+            'last_seen': status_info['last_seen'].isoformat()
+        }
     
     async def broadcast_user_status(self, user_id, is_online):
         status_info = await self.get_user_status(user_id)
@@ -147,12 +171,25 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 }
             )
     
-    @database_sync_to_async
-    def create_message(self, content, sender_id):
-        return {
-            'message_id': str(timezone.now().timestamp()),
-            'content': content,
-            'sender': {'user_id': sender_id},
-            'created_at': timezone.now().isoformat()
-        }
-
+    async def broadcast_user_status_later(self, user_id, delay):
+        try:
+            await asyncio.sleep(delay)
+            await self.broadcast_user_status(user_id, False)
+        except Exception as e:
+            logger.error(f"Error broadcasting status for user {user_id}: {e}")
+    
+    async def create_message(self, content, sender_id, client_id=None):
+        # The writer broadcasts the stored message to the room; the sender also gets an ack
+        # carrying the real message_id so it can reconcile its optimistic copy
+        try:
+            message = await message_writer.submit(self.room_id, sender_id, content)
+        except (MessageRejected, ValueError) as e:
+            await self.send(text_data=json.dumps({'type': 'message_error', 'client_id': client_id, 'error': str(e)}))
+            return None
+        except Exception as e:
+            logger.error(f"Error saving message in room {self.room_id}: {e}")
+            await self.send(text_data=json.dumps({'type': 'message_error', 'client_id': client_id, 'error': 'Message could not be sent'}))
+            return None
+        
+        await self.send(text_data=json.dumps({'type': 'message_ack', 'client_id': client_id, 'message': message}))
+        return message
@@ -0,0 +1,114 @@
+from django.db import transaction
+from django.utils import timezone
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from datetime import timedelta
+import asyncio, logging, uuid
+from users.models import Users
+from .models import ChatRoom, ChatParticipant, Message
+from .serializers import MessageSerializer
+
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_FLUSH_INTERVAL = 0.05
+MESSAGE_FLUSH_BATCH_SIZE = 200
+
+
+class MessageRejected(Exception):
+    pass
+
+
+class MessageWriter:
+    # Messages sent over the socket are buffered for a few milliseconds and written with
+    # one bulk_create per flush. A single flusher task per event loop writes batches one
+    # after another and broadcasts them in arrival order, so rooms never see a reply
+    # before the message it answers.
+    def __init__(self, flush_interval=MESSAGE_FLUSH_INTERVAL, batch_size=MESSAGE_FLUSH_BATCH_SIZE):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending = []
+        self._loop = None
+        self._flusher = None
+        self._last_created_at = None
+
+    async def submit(self, room_id, sender_id, content):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._flusher, self._pending = loop, None, []
+
+        future = loop.create_future()
+        message = Message(
+            room_id=uuid.UUID(str(room_id)),
+            sender_id=uuid.UUID(str(sender_id)),
+            content=content,
+            message_type='text',
+            created_at=self._next_created_at(),
+        )
+        self._pending.append((message, future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._run())
+        return await future
+
+    def _next_created_at(self):
+        # Strictly increasing within the process so messages sharing a clock tick keep their order
+        now = timezone.now()
+        if self._last_created_at and now <= self._last_created_at:
+            now = self._last_created_at + timedelta(microseconds=1)
+        self._last_created_at = now
+        return now
+
+    async def _run(self):
+        while self._pending:
+            if len(self._pending) < self.batch_size:
+                await asyncio.sleep(self.flush_interval)
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        try:
+            saved, rejected = await self._persist([message for message, _ in batch])
+        except Exception as e:
+            logger.error(f"Error writing chat messages: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        channel_layer = get_channel_layer()
+        for message, future in batch:
+            if future.done():
+                continue
+            if message.message_id in rejected:
+                future.set_exception(MessageRejected('Sender is not a participant of this room'))
+                continue
+            message_data = saved[message.message_id]
+            try:
+                await channel_layer.group_send(f'chat_{message.room_id}', {'type': 'chat_message', 'message': message_data})
+            except Exception as e:
+                logger.error(f"Error broadcasting message {message.message_id}: {e}")
+            future.set_result(message_data)
+
+    @database_sync_to_async
+    def _persist(self, messages):
+        allowed = set(ChatParticipant.objects.filter(
+            room_id__in={message.room_id for message in messages},
+            user_id__in={message.sender_id for message in messages},
+        ).values_list('room_id', 'user_id'))
+        accepted = [message for message in messages if (message.room_id, message.sender_id) in allowed]
+        rejected = {message.message_id for message in messages if (message.room_id, message.sender_id) not in allowed}
+        if not accepted:
+            return {}, rejected
+
+        with transaction.atomic():
+            Message.objects.bulk_create(accepted)
+            ChatRoom.record_messages(accepted)
+
+        senders = Users.objects.in_bulk({message.sender_id for message in accepted})
+        for message in accepted:
+            message.sender = senders[message.sender_id]
+        data = MessageSerializer(accepted, many=True).data
+        return {message.message_id: item for message, item in zip(accepted, data)}, rejected
+
+
+message_writer = MessageWriter()
@@ -1,11 +1,11 @@
-from django.utils import timezone
-from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from channels.middleware import BaseMiddleware
 from channels.db import database_sync_to_async
+from rest_framework_simplejwt.tokens import AccessToken, TokenError
 from urllib.parse import parse_qs
-import jwt
-from django.conf import settings
+from users.models import Users
+from users.auth_cache import get_user_for_token
+from .activity import activity_tracker
 
 
 class UserActivityMiddleware:
@@ -16,14 +16,7 @@ class UserActivityMiddleware:
         response = self.get_response(request)
         
         if request.user.is_authenticated:
-            now = timezone.now()
-            if not hasattr(request.user, 'last_seen') or \
-               (now - request.user.last_seen).total_seconds() > 300:
-                User = get_user_model()
-                User.objects.filter(pk=request.user.pk).update(
-                    last_seen=now,
-                    last_activity=now
-                )
+            activity_tracker.record(request.user.pk)
         
         return response
 
@@ -60,24 +53,18 @@ class JWTAuthMiddleware(BaseMiddleware):
             return AnonymousUser()
 
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            
-            user_id = payload.get('user_id')
-            if not user_id:
+            # Same checks as the HTTP cookie authentication: signature, expiry and revoked jti
+            access_token = AccessToken(token)
+            user, revoked = get_user_for_token(access_token['user_id'], access_token['jti'])
+            if revoked or user.is_blocked:
                 return AnonymousUser()
-
-            User = get_user_model()
-            user = User.objects.get(user_id=user_id)
             return user
 
-        except jwt.ExpiredSignatureError:
-            print("JWT token has expired")
-            return AnonymousUser()
-        except jwt.InvalidTokenError:
-            print("Invalid JWT token")
+        except TokenError as e:
+            print(f"Invalid JWT token: {e}")
             return AnonymousUser()
-        except User.DoesNotExist:
-            print(f"User with ID {user_id} not found")
+        except Users.DoesNotExist:
+            print("User for JWT token not found")
             return AnonymousUser()
         except Exception as e:
             print(f"Error authenticating user: {e}")
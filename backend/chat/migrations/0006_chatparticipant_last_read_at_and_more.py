@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 03:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Q, Subquery
+
+
+def backfill_read_cursors(apps, schema_editor):
+    ChatParticipant = apps.get_model('chat', 'ChatParticipant')
+    Message = apps.get_model('chat', 'Message')
+
+    # A member has read up to the latest message they either sent or had marked read
+    last_read = Message.objects.filter(
+        Q(sender=OuterRef('user')) | Q(is_read=True), room=OuterRef('room')
+    ).order_by('-created_at')
+    ChatParticipant.objects.update(
+        last_read_message=Subquery(last_read.values('pk')[:1]),
+        last_read_at=Subquery(last_read.values('created_at')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_chatroom_last_message_chatparticipant_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatparticipant',
+            name='last_read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatparticipant',
+            name='last_read_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.message'),
+        ),
+        migrations.RunPython(backfill_read_cursors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-18 03:16
+
+from django.db import migrations, models
+
+
+def backfill_direct_keys(apps, schema_editor):
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    ChatParticipant = apps.get_model('chat', 'ChatParticipant')
+
+    members = {}
+    for room_id, user_id in ChatParticipant.objects.values_list('room_id', 'user_id').iterator():
+        members.setdefault(room_id, []).append(str(user_id))
+
+    # Rooms already duplicated by the old race keep a NULL key; the most recently active one wins
+    keyed = set()
+    rooms = []
+    for room in ChatRoom.objects.order_by('-updated_at').only('room_id', 'direct_key').iterator():
+        user_ids = members.get(room.room_id, [])
+        if len(user_ids) != 2:
+            continue
+        direct_key = ':'.join(sorted(user_ids))
+        if direct_key in keyed:
+            continue
+        keyed.add(direct_key)
+        room.direct_key = direct_key
+        rooms.append(room)
+    ChatRoom.objects.bulk_update(rooms, ['direct_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0006_chatparticipant_last_read_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroom',
+            name='direct_key',
+            field=models.CharField(blank=True, editable=False, max_length=73, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_direct_keys, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
-from django.db import models
-from django.db.models import Count
+from django.db import models, transaction, IntegrityError
+from django.db.models import Case, When, Value, F
+from django.utils import timezone
+from collections import Counter
 import uuid
 from django.conf import settings
 
@@ -9,7 +11,9 @@ from django.conf import settings
 
 class ChatRoom(models.Model):
     room_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    participants = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='chat_rooms')
+    participants = models.ManyToManyField(settings.AUTH_USER_MODEL, through='ChatParticipant', related_name='chat_rooms')
+    last_message = models.ForeignKey('Message', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    direct_key = models.CharField(max_length=73, unique=True, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -19,28 +23,102 @@ class ChatRoom(models.Model):
     def __str__(self):
         return f"Chat Room {self.room_id}"
     
+    @staticmethod
+    def build_direct_key(user1, user2):
+        # Canonical ordered pair, so both users map a conversation to the same key
+        return ':'.join(sorted([str(user1.user_id), str(user2.user_id)]))
+    
     @classmethod
     def get_or_create_room(cls, user1, user2):
-        existing_room = cls.objects.filter(
-            participants__in=[user1, user2]
-        ).annotate(
-            participant_count=Count('participants')
-        ).filter(
-            participant_count=2
-        ).first()
-        
-        if existing_room and set(existing_room.participants.all()) == {user1, user2}:
+        direct_key = cls.build_direct_key(user1, user2)
+        existing_room = cls.objects.filter(direct_key=direct_key).first()
+        if existing_room:
             return existing_room, False
         
-        room = cls.objects.create()
-        room.participants.set([user1, user2])
-        return room, True
+        try:
+            with transaction.atomic():
+                room = cls.objects.create(direct_key=direct_key)
+                ChatParticipant.objects.bulk_create([ChatParticipant(room=room, user=user1), ChatParticipant(room=room, user=user2)])
+            return room, True
+        except IntegrityError:
+            # Another request created the room first; the unique key makes it the only one
+            return cls.objects.get(direct_key=direct_key), False
     
     def get_other_participant(self, user):
-        return self.participants.exclude(user_id=user.user_id).first()
+        # Iterates participants so a prefetched room list doesn't query per room
+        return next((participant for participant in self.participants.all() if participant.user_id != user.user_id), None)
     
     def get_last_message(self):
-        return self.messages.first()
+        return self.last_message
+    
+    def mark_read_by(self, user):
+        # Moves the reader's cursor to the last message with one UPDATE and returns the membership,
+        # or None when there was nothing new to read. The last_message condition keeps a message
+        # written in the meantime counted as unread.
+        membership = ChatParticipant.objects.filter(room=self, user=user).first()
+        if membership is None or self.last_message_id is None or membership.last_read_message_id == self.last_message_id:
+            return None
+        
+        marked_read = membership.unread_count
+        updated = ChatParticipant.objects.filter(pk=membership.pk, room__last_message=self.last_message_id).update(
+            last_read_message=self.last_message_id,
+            last_read_at=self.last_message.created_at,
+            unread_count=0
+        )
+        if not updated:
+            return None
+        
+        membership.last_read_message_id = self.last_message_id
+        membership.last_read_at = self.last_message.created_at
+        membership.unread_count = 0
+        membership.marked_read = marked_read
+        return membership
+    
+    def get_read_cursors(self):
+        return dict(self.memberships.values_list('user_id', 'last_read_at'))
+    
+    @classmethod
+    def record_messages(cls, messages):
+        # Keeps the denormalized last message and the other members' unread counters in step
+        # with newly written messages; call it in the transaction that inserts them
+        latest = {}
+        unread = Counter()
+        for message in messages:
+            if message.room_id not in latest or message.created_at >= latest[message.room_id].created_at:
+                latest[message.room_id] = message
+            unread[(message.room_id, message.sender_id)] += 1
+        if not latest:
+            return
+        
+        cls.objects.filter(room_id__in=latest).update(
+            last_message=Case(
+                *[When(room_id=room_id, then=Value(message.message_id)) for room_id, message in latest.items()],
+                output_field=models.UUIDField()
+            ),
+            updated_at=timezone.now()
+        )
+        for (room_id, sender_id), count in unread.items():
+            ChatParticipant.objects.filter(room_id=room_id).exclude(user_id=sender_id).update(
+                unread_count=F('unread_count') + count
+            )
+
+
+class ChatParticipant(models.Model):
+    # The table Django created for the plain participants relation, now with per-member state
+    room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name='memberships', db_column='chatroom_id')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='chat_memberships', db_column='users_id')
+    unread_count = models.PositiveIntegerField(default=0)
+    # Read cursor: everything up to this message has been seen. last_read_at mirrors its
+    # created_at so read state can be compared without joining the message.
+    last_read_message = models.ForeignKey('Message', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'chat_chatroom_participants'
+        unique_together = ('room', 'user')
+    
+    def __str__(self):
+        return f"{self.user_id} in {self.room_id}"
 
 
 class Message(models.Model):
@@ -57,16 +135,14 @@ class Message(models.Model):
     media_url = models.URLField(blank=True, null=True)
     media_filename = models.CharField(max_length=255, blank=True, null=True)
     is_read = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['room', 'created_at', 'message_id'], name='message_room_created_idx'),
+        ]
     
     def __str__(self):
         return f"Message from {self.sender.email} in {self.room.room_id}"
-    
-    def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.save(update_fields=['is_read'])
 
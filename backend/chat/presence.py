@@ -0,0 +1,145 @@
+from django.utils import timezone
+from django_redis import get_redis_connection
+from datetime import datetime, timezone as dt_timezone
+import time
+
+
+# Clients ping every 30 seconds, so a user whose connections all stop pinging drops
+# offline after missing a few heartbeats even if the disconnect was never seen
+PRESENCE_TTL = 90
+
+CONNECTIONS_KEY_PREFIX = 'presence:conn'
+LAST_SEEN_KEY = 'presence:last_seen'
+DIRTY_KEY = 'presence:dirty'
+FLUSHING_KEY = 'presence:dirty:flushing'
+BROADCAST_KEY_PREFIX = 'presence:broadcast'
+BROADCAST_STATE_TTL = 60 * 60
+
+_DISCONNECT_SCRIPT = """
+local remaining = redis.call('DECR', KEYS[1])
+if remaining <= 0 then
+    redis.call('DEL', KEYS[1])
+end
+return remaining
+"""
+
+
+_TAKE_DIRTY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('SUNIONSTORE', KEYS[2], KEYS[2], KEYS[1])
+    redis.call('DEL', KEYS[1])
+end
+return redis.call('SMEMBERS', KEYS[2])
+"""
+
+
+# Returns 1 and stores the state when it differs from the last one broadcast, otherwise 0
+_CLAIM_BROADCAST_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+"""
+
+
+def _connection():
+    return get_redis_connection('default')
+
+
+def _connections_key(user_id):
+    return f"{CONNECTIONS_KEY_PREFIX}:{user_id}"
+
+
+def _record_last_seen(pipeline, user_id):
+    pipeline.hset(LAST_SEEN_KEY, str(user_id), time.time())
+    pipeline.sadd(DIRTY_KEY, str(user_id))
+
+
+def mark_online(user_id):
+    # One counter per user so a second tab closing doesn't flip the user offline
+    pipeline = _connection().pipeline()
+    pipeline.incr(_connections_key(user_id))
+    pipeline.expire(_connections_key(user_id), PRESENCE_TTL)
+    _record_last_seen(pipeline, user_id)
+    pipeline.execute()
+
+
+def mark_offline(user_id):
+    connection = _connection()
+    connection.eval(_DISCONNECT_SCRIPT, 1, _connections_key(user_id))
+    pipeline = connection.pipeline()
+    _record_last_seen(pipeline, user_id)
+    pipeline.execute()
+
+
+def heartbeat(user_id):
+    pipeline = _connection().pipeline()
+    # Re-creates the counter if it already expired while the socket was still open
+    pipeline.set(_connections_key(user_id), 1, nx=True)
+    pipeline.expire(_connections_key(user_id), PRESENCE_TTL)
+    _record_last_seen(pipeline, user_id)
+    pipeline.execute()
+
+
+def get_presence(user_ids):
+    user_ids = [str(user_id) for user_id in user_ids]
+    if not user_ids:
+        return {}
+
+    pipeline = _connection().pipeline()
+    pipeline.mget([_connections_key(user_id) for user_id in user_ids])
+    pipeline.hmget(LAST_SEEN_KEY, user_ids)
+    connections, last_seen_values = pipeline.execute()
+
+    presence = {}
+    for user_id, connection_count, last_seen in zip(user_ids, connections, last_seen_values):
+        presence[user_id] = {
+            'is_online': bool(connection_count) and int(connection_count) > 0,
+            'last_seen': datetime.fromtimestamp(float(last_seen), tz=dt_timezone.utc) if last_seen else None,
+        }
+    return presence
+
+
+def attach_presence(users):
+    # Loads presence for a whole page of users in one round trip before serializing them
+    users = [user for user in users if user is not None]
+    presence = get_presence([user.user_id for user in users])
+    for user in users:
+        user._presence = presence[str(user.user_id)]
+    return users
+
+
+def get_status_text(is_online, last_seen):
+    if is_online:
+        return "online"
+
+    now = timezone.now()
+    time_diff = now - last_seen
+
+    if time_diff.total_seconds() < 300:
+        return "recently_active"
+    elif time_diff.days == 0:
+        return "today"
+    elif time_diff.days == 1:
+        return "yesterday"
+    elif time_diff.days < 7:
+        return f"{time_diff.days} days ago"
+    else:
+        return "long_time_ago"
+
+
+def take_dirty_presence():
+    # Moves pending updates aside so new ones start a fresh set; a failed flush is merged into the next one
+    user_ids = [user_id.decode() for user_id in _connection().eval(_TAKE_DIRTY_SCRIPT, 2, DIRTY_KEY, FLUSHING_KEY)]
+    return get_presence(user_ids)
+
+
+def ack_dirty_presence():
+    _connection().delete(FLUSHING_KEY)
+
+
+def claim_presence_broadcast(room_id, user_id, is_online):
+    # Shared across workers, so a second tab or a quick reconnect doesn't repeat a status the room already has
+    key = f"{BROADCAST_KEY_PREFIX}:{room_id}:{user_id}"
+    return _connection().eval(_CLAIM_BROADCAST_SCRIPT, 1, key, int(is_online), BROADCAST_STATE_TTL) == 1
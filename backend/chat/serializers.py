@@ -1,9 +1,19 @@
 from rest_framework import serializers
 from users.models import Users
 from .models import ChatRoom, Message
+from .presence import attach_presence
+
+
+class ChatUserListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        users = list(data.all() if hasattr(data, 'all') else data)
+        attach_presence(users)
+        return super().to_representation(users)
 
 
 class ChatUserSerializer(serializers.ModelSerializer):
+    is_online = serializers.SerializerMethodField()
+    last_seen = serializers.SerializerMethodField()
     online_status = serializers.SerializerMethodField()
     last_seen_display = serializers.SerializerMethodField()
     
@@ -13,12 +23,20 @@ class ChatUserSerializer(serializers.ModelSerializer):
             'user_id', 'full_name', 'email', 'profile_image', 'role',
             'is_online', 'last_seen', 'online_status', 'last_seen_display'
         ]
+        list_serializer_class = ChatUserListSerializer
+    
+    def get_is_online(self, obj):
+        return obj.get_presence()['is_online']
+    
+    def get_last_seen(self, obj):
+        last_seen = obj.get_presence()['last_seen']
+        return last_seen.isoformat() if last_seen else None
     
     def get_online_status(self, obj):
         return obj.get_online_status()
     
     def get_last_seen_display(self, obj):
-        if obj.is_online:
+        if obj.get_presence()['is_online']:
             return "Online"
         
         status = obj.get_online_status()
@@ -32,8 +50,16 @@ class ChatUserSerializer(serializers.ModelSerializer):
         return status_map.get(status, status)
 
 
+class MessageListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        messages = list(data.all() if hasattr(data, 'all') else data)
+        attach_presence([message.sender for message in messages])
+        return super().to_representation(messages)
+
+
 class MessageSerializer(serializers.ModelSerializer):
     sender = ChatUserSerializer(read_only=True)
+    is_read = serializers.SerializerMethodField()
     
     class Meta:
         model = Message
@@ -41,6 +67,27 @@ class MessageSerializer(serializers.ModelSerializer):
             'message_id', 'content', 'message_type', 'media_url', 
             'media_filename', 'sender', 'is_read', 'created_at'
         ]
+        list_serializer_class = MessageListSerializer
+    
+    def get_is_read(self, obj):
+        # Read by anyone other than the sender whose cursor has reached it
+        read_cursors = self.context.get('read_cursors')
+        if read_cursors is None:
+            return obj.is_read
+        return any(
+            read_at and read_at >= obj.created_at
+            for user_id, read_at in read_cursors.items() if user_id != obj.sender_id
+        )
+
+
+class ChatRoomListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        rooms = list(data.all() if hasattr(data, 'all') else data)
+        request_user = self.context['request'].user
+        users = [room.get_other_participant(request_user) for room in rooms]
+        users += [room.last_message.sender for room in rooms if room.last_message]
+        attach_presence(users)
+        return super().to_representation(rooms)
 
 
 class ChatRoomSerializer(serializers.ModelSerializer):
@@ -55,6 +102,7 @@ class ChatRoomSerializer(serializers.ModelSerializer):
             'room_id', 'other_participant', 'last_message', 'unread_count',
             'updated_at', 'other_participant_online_status'
         ]
+        list_serializer_class = ChatRoomListSerializer
     
     def get_other_participant(self, obj):
         request_user = self.context['request'].user
@@ -63,11 +111,21 @@ class ChatRoomSerializer(serializers.ModelSerializer):
     
     def get_last_message(self, obj):
         last_message = obj.get_last_message()
-        return MessageSerializer(last_message).data if last_message else None
+        if not last_message:
+            return None
+        if hasattr(obj, 'last_message_read'):
+            # The room list annotates the read state so the page needs no cursor query per room
+            data = MessageSerializer(last_message).data
+            data['is_read'] = obj.last_message_read
+            return data
+        return MessageSerializer(last_message, context={'read_cursors': obj.get_read_cursors()}).data
     
     def get_unread_count(self, obj):
         request_user = self.context['request'].user
-        return obj.messages.filter(is_read=False).exclude(sender=request_user).count()
+        if hasattr(obj, 'unread_count'):
+            return obj.unread_count or 0
+        membership = obj.memberships.filter(user=request_user).first()
+        return membership.unread_count if membership else 0
     
     def get_other_participant_online_status(self, obj):
         request_user = self.context['request'].user
@@ -76,9 +134,10 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         if not other_user:
             return {'is_online': False, 'last_seen': None, 'status_text': 'Unknown'}
         
+        presence = other_user.get_presence()
         return {
-            'is_online': other_user.is_online,
-            'last_seen': other_user.last_seen.isoformat() if other_user.last_seen else None,
+            'is_online': presence['is_online'],
+            'last_seen': presence['last_seen'].isoformat() if presence['last_seen'] else None,
             'status_text': other_user.get_online_status()
         }
 
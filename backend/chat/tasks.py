@@ -0,0 +1,52 @@
+from celery import shared_task
+from django.db.models import Case, When, Value, F, BooleanField, DateTimeField
+from django.db.models.functions import Greatest
+from users.models import Users
+from .presence import take_dirty_presence, ack_dirty_presence, get_presence
+import time
+
+
+PRESENCE_FLUSH_BATCH_SIZE = 500
+
+
+@shared_task
+def flush_presence(batch_size=PRESENCE_FLUSH_BATCH_SIZE):
+    started = time.monotonic()
+    presence = take_dirty_presence()
+    
+    # Only users whose presence changed since the last run are written, as one CASE update per batch.
+    # last_seen only moves forward, so a late flush can't undo a newer write from request activity
+    items = [(user_id, status) for user_id, status in presence.items() if status['last_seen']]
+    for index in range(0, len(items), batch_size):
+        batch = items[index:index + batch_size]
+        is_online = Case(
+            *[When(user_id=user_id, then=Value(status['is_online'])) for user_id, status in batch],
+            output_field=BooleanField()
+        )
+        seen_at = Case(
+            *[When(user_id=user_id, then=Value(status['last_seen'])) for user_id, status in batch],
+            output_field=DateTimeField()
+        )
+        Users.objects.filter(user_id__in=[user_id for user_id, _ in batch]).update(
+            is_online=is_online, last_seen=Greatest(F('last_seen'), seen_at)
+        )
+    ack_dirty_presence()
+    
+    swept_count = _sweep_expired_presence(batch_size)
+    
+    elapsed = time.monotonic() - started
+    return f"Flushed presence for {len(items)} users, {swept_count} expired offline in {elapsed:.2f}s"
+
+
+def _sweep_expired_presence(batch_size):
+    # A socket that dies without a disconnect only lets its Redis counter expire, which never marks
+    # the user dirty; users the database still shows online are checked against Redis instead
+    online_ids = list(Users.objects.filter(is_online=True).values_list('user_id', flat=True))
+    expired_ids = []
+    for index in range(0, len(online_ids), batch_size):
+        presence = get_presence(online_ids[index:index + batch_size])
+        expired_ids += [user_id for user_id, status in presence.items() if not status['is_online']]
+    
+    for index in range(0, len(expired_ids), batch_size):
+        Users.objects.filter(user_id__in=expired_ids[index:index + batch_size], is_online=True).update(is_online=False)
+    return len(expired_ids)
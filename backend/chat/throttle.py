@@ -0,0 +1,60 @@
+from collections import Counter
+import os, threading, time
+
+
+TYPING_COALESCE_WINDOW = 3
+PRESENCE_OFFLINE_GRACE = 3
+
+
+class ChatEventMetrics:
+    # Delivered vs suppressed typing and presence events for this process
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, kind, delivered):
+        with self._lock:
+            self._counts[f"{kind}_{'delivered' if delivered else 'suppressed'}"] += 1
+
+    def metrics(self):
+        with self._lock:
+            counts = dict(self._counts)
+        stats = {}
+        for kind in ('typing', 'presence'):
+            delivered = counts.get(f'{kind}_delivered', 0)
+            suppressed = counts.get(f'{kind}_suppressed', 0)
+            total = delivered + suppressed
+            stats[kind] = {
+                'delivered': delivered,
+                'suppressed': suppressed,
+                'suppressed_ratio': suppressed / total if total else 0.0,
+            }
+        stats['pid'] = os.getpid()
+        return stats
+
+
+class TypingThrottle:
+    # One per socket. A typing state is forwarded when it changes; a repeated "typing" is only
+    # re-sent once the window has passed, so clients that emit a frame per keystroke still
+    # produce about one group_send per user and room every few seconds
+    def __init__(self, window=TYPING_COALESCE_WINDOW):
+        self.window = window
+        self._last_sent = {}
+
+    def should_send(self, user_id, is_typing):
+        now = time.monotonic()
+        last = self._last_sent.get(user_id)
+        if last is None:
+            send = is_typing
+        elif last[0] != is_typing:
+            send = True
+        else:
+            send = is_typing and now - last[1] >= self.window
+
+        if send:
+            self._last_sent[user_id] = (is_typing, now)
+        event_metrics.record('typing', send)
+        return send
+
+
+event_metrics = ChatEventMetrics()
@@ -4,14 +4,17 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
 from django.shortcuts import get_object_or_404
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
-from django.db.models import Q
-from django.utils import timezone
+from django.db import transaction
+from django.db.models import Q, OuterRef, Subquery, Exists
 import logging
+from eventify.pagination import AnchoredKeysetPagination
+from notifications.fanout import notify_users
 from users.models import Users
-from .models import ChatRoom
+from .models import ChatRoom, ChatParticipant
 from .serializers import ChatRoomSerializer, MessageSerializer, CreateMessageSerializer
 
 
@@ -29,6 +32,31 @@ class MessagePagination(PageNumberPagination):
     max_page_size = 50
 
 
+class MessageCursorPagination(AnchoredKeysetPagination):
+    # Newest first: ?before=<message_id> walks back through history, ?after=<message_id>
+    # fetches what arrived since. Both seek on (created_at, message_id) and skip the COUNT.
+    ordering = ('-created_at', '-message_id')
+    anchor_field = 'message_id'
+    page_size = 15
+    max_page_size = 50
+
+
+def mark_room_read(room, user):
+    # One write for the cursor and one receipt event for the room, however many messages it covers
+    membership = room.mark_read_by(user)
+    if membership:
+        try:
+            async_to_sync(get_channel_layer().group_send)(f'chat_{room.room_id}', {
+                'type': 'messages_read',
+                'user_id': str(user.user_id),
+                'last_read_message_id': str(membership.last_read_message_id),
+                'last_read_at': membership.last_read_at.isoformat(),
+            })
+        except Exception as e:
+            logger.error(f"Error broadcasting read receipt for room {room.room_id}: {e}")
+    return membership
+
+
 @permission_classes([IsAuthenticated])
 class ChatRoomListView(APIView):
     pagination_class = ChatRoomPagination
@@ -36,7 +64,15 @@ class ChatRoomListView(APIView):
     def get(self, request):
         try:
             search_query = request.GET.get('search', '').strip()
-            chat_rooms = ChatRoom.objects.filter(participants=request.user).prefetch_related('participants', 'messages').order_by('-updated_at')
+            unread_count = ChatParticipant.objects.filter(room=OuterRef('pk'), user=request.user).values('unread_count')[:1]
+            chat_rooms = ChatRoom.objects.filter(participants=request.user).select_related(
+                'last_message__sender'
+            ).prefetch_related('participants').annotate(
+                unread_count=Subquery(unread_count),
+                last_message_read=Exists(ChatParticipant.objects.filter(
+                    room=OuterRef('pk'), last_read_at__gte=OuterRef('last_message__created_at')
+                ).exclude(user=OuterRef('last_message__sender')))
+            ).order_by('-updated_at')
             
             if search_query:
                 chat_rooms = chat_rooms.filter(
@@ -80,18 +116,20 @@ class ChatMessagesView(APIView):
     
     def get(self, request, room_id):
         try:
-            room = get_object_or_404(ChatRoom, room_id=room_id, participants=request.user)
-            unread_messages = room.messages.filter(is_read=False).exclude(sender=request.user)
+            room = get_object_or_404(ChatRoom.objects.select_related('last_message'), room_id=room_id, participants=request.user)
+            mark_room_read(room, request.user)
             
-            for message in unread_messages:
-                message.mark_as_read()
-            
-            paginator = self.pagination_class()
+            if any(param in request.query_params for param in ('before', 'after')) or request.query_params.get('pagination') == 'cursor':
+                paginator = MessageCursorPagination()
+            else:
+                paginator = self.pagination_class()
             messages = room.messages.select_related('sender')
             result_page = paginator.paginate_queryset(messages, request)
-            serializer = MessageSerializer(result_page, many=True)
+            serializer = MessageSerializer(result_page, many=True, context={'read_cursors': room.get_read_cursors()})
             
             return paginator.get_paginated_response(serializer.data)
+        except NotFound as e:
+            return Response({'error': str(e.detail)}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.error(f"Error fetching messages for room {room_id}: {e}")
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -102,8 +140,9 @@ class ChatMessagesView(APIView):
             serializer = CreateMessageSerializer(data=request.data, context={'request': request, 'room': room})
             
             if serializer.is_valid():
-                message = serializer.save()
-                room.save(update_fields=['updated_at'])
+                with transaction.atomic():
+                    message = serializer.save()
+                    ChatRoom.record_messages([message])
                 channel_layer = get_channel_layer()
                 room_group_name = f'chat_{room_id}'
                 message_data = MessageSerializer(message).data
@@ -114,7 +153,7 @@ class ChatMessagesView(APIView):
                 if other_participant:
                     self.send_message_notification(message, other_participant, room)
                 
-                return Response(MessageSerializer(message).data, status=status.HTTP_201_CREATED)
+                return Response(message_data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error sending message in room {room_id}: {e}")
@@ -122,27 +161,14 @@ class ChatMessagesView(APIView):
     
     def send_message_notification(self, message, recipient, room):
         try:
-            # Create notification data
-            notification_data = {
-                'type': 'new_message',
-                'message': f"You have a new message from {message.sender.full_name}",
+            notify_users([recipient.user_id], 'new_message', f"You have a new message from {message.sender.full_name}", {
                 'sender_id': str(message.sender.user_id),
                 'sender_name': message.sender.full_name,
                 'sender_image': message.sender.profile_image or '',
                 'room_id': str(room.room_id),
                 'message_preview': message.content[:50] + ('...' if len(message.content) > 50 else '') if message.content else 'Sent an image',
                 'message_type': message.message_type,
-                'timestamp': timezone.now().isoformat()
-            }
-            
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f'notifications_{recipient.user_id}',
-                {
-                    'type': 'send_notification',
-                    'notification': notification_data
-                }
-            )
+            })
             logging.info(f"Notification sent to {recipient.full_name} for new message in room {room.room_id}")
             
         except Exception as e:
@@ -153,12 +179,10 @@ class ChatMessagesView(APIView):
 class MarkMessagesReadView(APIView):
     def post(self, request, room_id):
         try:
-            room = get_object_or_404(ChatRoom, room_id=room_id, participants=request.user)
-            
-            unread_messages = room.messages.filter(is_read=False).exclude(sender=request.user)
-            updated_count = unread_messages.update(is_read=True)
+            room = get_object_or_404(ChatRoom.objects.select_related('last_message'), room_id=room_id, participants=request.user)
+            membership = mark_room_read(room, request.user)
             
-            return Response({'marked_read': updated_count}, status=status.HTTP_200_OK)
+            return Response({'marked_read': membership.marked_read if membership else 0}, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(f"Error marking messages as read in room {room_id}: {e}")
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
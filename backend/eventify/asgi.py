@@ -12,6 +12,6 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eventify.settings')
 
 application = ProtocolTypeRouter({
     "http": get_asgi_application(),
-    "websocket":  URLRouter(websocket_urlpatterns)
+    "websocket": JWTAuthMiddlewareStack(URLRouter(websocket_urlpatterns))
 })
 
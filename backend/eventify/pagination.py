@@ -0,0 +1,188 @@
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from datetime import date, datetime
+from uuid import UUID
+import base64, json
+
+
+# Seeks from the last seen row instead of using OFFSET, so deep pages cost the same as
+# the first one. `ordering` must be unique; COUNT(*) only runs when include_count=true.
+class KeysetPagination(BasePagination):
+    ordering = None
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'include_count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.queryset = queryset
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.get_position(request)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() == 'true':
+            self.count = queryset.count()
+
+        queryset = queryset.order_by(*self._get_ordering(reverse))
+        if position is not None:
+            queryset = queryset.filter(self._get_seek_filter(position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        # Walking backwards means there is always a page after this one, and vice versa
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        response_data = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            response_data = {'count': self.count, **response_data}
+        return Response(response_data)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_position(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        return self.decode_cursor(encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.build_link(self._get_row_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.build_link(self._get_row_position(self.page[0]), reverse=True)
+
+    def build_link(self, position, reverse):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': [self._serialize_value(value) for value in position], 'r': int(reverse)})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, encoded):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            position = payload['p']
+            reverse = bool(payload.get('r', 0))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return self._clean_position(position), reverse
+
+    def _clean_position(self, position):
+        # A well-formed cursor can still carry values the columns can't hold, such as a bad date;
+        # those must fail here as an invalid cursor rather than later inside the query
+        cleaned = []
+        for field, value in zip(self.ordering, position):
+            try:
+                cleaned.append(self.queryset.model._meta.get_field(field.lstrip('-')).to_python(value))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+            if cleaned[-1] is None:
+                raise NotFound(self.invalid_cursor_message)
+        return cleaned
+
+    def _get_ordering(self, reverse):
+        if not reverse:
+            return list(self.ordering)
+        return [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+
+    def _get_seek_filter(self, position, reverse):
+        # (a, b) > (x, y) expands to: a >= x AND (a > x OR (a = x AND b > y)). The leading bound
+        # is redundant for the result but lets the index scan start at the cursor instead of
+        # walking every row before it
+        seek_filter = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            condition = Q(**{f'{name}__{"lt" if descending else "gt"}': position[index]})
+            for previous_field, previous_value in zip(self.ordering[:index], position[:index]):
+                condition &= Q(**{previous_field.lstrip('-'): previous_value})
+            seek_filter |= condition
+
+        leading = self.ordering[0]
+        descending = leading.startswith('-') != reverse
+        return Q(**{f'{leading.lstrip("-")}__{"lte" if descending else "gte"}': position[0]}) & seek_filter
+
+    def _get_row_position(self, row):
+        return [getattr(row, field.lstrip('-')) for field in self.ordering]
+
+    def _serialize_value(self, value):
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, UUID):
+            return str(value)
+        return value
+
+
+# Keyset pagination whose cursors are row ids: ?before=<id> continues in `ordering` direction
+# from that row and ?after=<id> walks back the other way. The anchor row is looked up in the
+# paginated queryset, so ids from another scope are rejected.
+class AnchoredKeysetPagination(KeysetPagination):
+    anchor_field = None
+    before_query_param = 'before'
+    after_query_param = 'after'
+
+    def get_position(self, request):
+        for param, reverse in ((self.before_query_param, False), (self.after_query_param, True)):
+            anchor = request.query_params.get(param)
+            if not anchor:
+                continue
+            try:
+                position = self.queryset.filter(**{self.anchor_field: anchor}).values_list(
+                    *[field.lstrip('-') for field in self.ordering]
+                ).first()
+            except (ValidationError, ValueError):
+                position = None
+            if position is None:
+                raise NotFound(self.invalid_cursor_message)
+            return list(position), reverse
+        return super().get_position(request)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._build_anchor_link(self.before_query_param, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._build_anchor_link(self.after_query_param, self.page[0])
+
+    def _build_anchor_link(self, param, row):
+        url = self.request.build_absolute_uri()
+        for stale_param in (self.before_query_param, self.after_query_param, self.cursor_query_param):
+            url = remove_query_param(url, stale_param)
+        return replace_query_param(url, param, self._serialize_value(getattr(row, self.anchor_field)))
@@ -17,6 +17,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'corsheaders',
@@ -38,6 +39,7 @@ INSTALLED_APPS = [
     'chat.apps.ChatConfig',
     'coupon.apps.CouponConfig',
     'reviews.apps.ReviewsConfig',
+    'reports.apps.ReportsConfig',
 ]
 
 MIDDLEWARE = [
@@ -196,6 +198,11 @@ CELERY_TIMEZONE = 'Asia/Kolkata'
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
 
+# Seat reservations
+# Seconds a pending booking holds its seat in Redis before it is released
+SEAT_HOLD_TTL = config('SEAT_HOLD_TTL', default=900, cast=int)
+
+
 # Stripe settings
 STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY')
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY')
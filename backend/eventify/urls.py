@@ -14,5 +14,7 @@ urlpatterns = [
     path('chat/', include('chat.urls')),
     path('coupon/', include('coupon.urls')),
     path('reviews/', include('reviews.urls')),
+    path('notifications/', include('notifications.urls')),
+    path('reports/', include('reports.urls')),
 ]
 
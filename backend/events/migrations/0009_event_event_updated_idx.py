@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 03:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0004_category_updated_at'),
+        ('events', '0008_event_search_vector_event_event_search_vector_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['updatedAt'], name='event_updated_idx'),
+        ),
+    ]
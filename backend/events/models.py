@@ -1,4 +1,7 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Upper
 import uuid
 
 
@@ -25,6 +28,17 @@ class Event(models.Model):
     is_settled_to_organizer = models.BooleanField(default=False)
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
+    # Maintained by the events_event_search_vector trigger (see migration 0008)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'eventId'], name='event_date_id_idx'),
+            models.Index(fields=['hostedBy', 'date', 'eventId'], name='event_host_date_id_idx'),
+            models.Index(fields=['updatedAt'], name='event_updated_idx'),
+            GinIndex(fields=['search_vector'], name='event_search_vector_idx'),
+            GinIndex(OpClass(Upper('location'), name='gin_trgm_ops'), name='event_location_trgm_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -0,0 +1,46 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Q, F, Value, FloatField
+from django.db.models.functions import Coalesce
+import re
+from categories.models import Category
+from users.models import Users
+
+
+SEARCH_CONFIG = 'english'
+
+
+def build_search_query(term):
+    words = re.findall(r'\w+', term or '')
+    if not words:
+        return None
+
+    # Every word is matched as a prefix so results keep up while the user is still typing
+    raw_query = ' & '.join(f"{word}:*" for word in words)
+    return SearchQuery(raw_query, search_type='raw', config=SEARCH_CONFIG)
+
+
+def _event_search_filter(term):
+    query = build_search_query(term)
+    if query is None:
+        return None
+
+    # Organizer and category names live in other tables, so they are matched through
+    # indexed subqueries instead of joins to keep the whole filter index-backed
+    organizer_ids = Users.objects.filter(role='organizer', full_name__icontains=term).values('user_id')
+    category_ids = Category.objects.filter(categoryName__icontains=term).values('categoryId')
+
+    return Q(search_vector=query) | Q(hostedBy__in=organizer_ids) | Q(category__in=category_ids)
+
+
+def search_events(queryset, term, ranked=True):
+    search_filter = _event_search_filter(term)
+    if search_filter is None:
+        return queryset
+
+    queryset = queryset.filter(search_filter)
+    if not ranked:
+        return queryset
+
+    query = build_search_query(term)
+    search_rank = Coalesce(SearchRank(F('search_vector'), query), Value(0.0), output_field=FloatField())
+    return queryset.annotate(search_rank=search_rank).order_by('-search_rank', 'date', 'eventId')
@@ -11,7 +11,7 @@ class EventSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ['search_vector']
 
     def get_tickets_available(self, obj):
         return obj.ticketLimit - obj.ticketsSold
@@ -24,9 +24,9 @@ def setup_periodic_tasks():
             }
         )
 
-        # Schedule for cancel_expired_pending_bookings (every hour)
+        # Schedule for cancel_expired_pending_bookings (every minute)
         cancel_schedule, _ = CrontabSchedule.objects.get_or_create(
-            minute='0',
+            minute='*',
             hour='*',
             day_of_week='*',
             day_of_month='*',
@@ -42,3 +42,110 @@ def setup_periodic_tasks():
             }
         )
 
+        # Schedule for deliver_email_outbox (every minute, catches mail queued while the broker was down and retries)
+        outbox_schedule, _ = CrontabSchedule.objects.get_or_create(
+            minute='*',
+            hour='*',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+        PeriodicTask.objects.update_or_create(
+            name='Deliver email outbox',
+            defaults={
+                'crontab': outbox_schedule,
+                'task': 'notifications.tasks.deliver_email_outbox',
+                'kwargs': json.dumps({}),
+                'enabled': True,
+            }
+        )
+
+        # Schedule for purge_email_outbox (every hour, sent mail is kept for a day)
+        outbox_purge_schedule, _ = CrontabSchedule.objects.get_or_create(
+            minute='15',
+            hour='*',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+        PeriodicTask.objects.update_or_create(
+            name='Purge email outbox',
+            defaults={
+                'crontab': outbox_purge_schedule,
+                'task': 'notifications.tasks.purge_email_outbox',
+                'kwargs': json.dumps({}),
+                'enabled': True,
+            }
+        )
+
+        # Schedule for sync_revoked_tokens (every hour)
+        revoked_tokens_schedule, _ = CrontabSchedule.objects.get_or_create(
+            minute='30',
+            hour='*',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+        PeriodicTask.objects.update_or_create(
+            name='Sync revoked tokens',
+            defaults={
+                'crontab': revoked_tokens_schedule,
+                'task': 'users.tasks.sync_revoked_tokens',
+                'kwargs': json.dumps({}),
+                'enabled': True,
+            }
+        )
+
+        # Schedule for flush_presence (every minute)
+        presence_schedule, _ = CrontabSchedule.objects.get_or_create(
+            minute='*',
+            hour='*',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+        PeriodicTask.objects.update_or_create(
+            name='Flush chat presence',
+            defaults={
+                'crontab': presence_schedule,
+                'task': 'chat.tasks.flush_presence',
+                'kwargs': json.dumps({}),
+                'enabled': True,
+            }
+        )
+
+        # Schedule for reconcile_booking_rollups (daily at 2:30 AM, re-checks the last five weeks)
+        rollups_schedule, _ = CrontabSchedule.objects.get_or_create(
+            minute='30',
+            hour='2',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+        PeriodicTask.objects.update_or_create(
+            name='Reconcile booking rollups',
+            defaults={
+                'crontab': rollups_schedule,
+                'task': 'booking.tasks.reconcile_booking_rollups',
+                'kwargs': json.dumps({}),
+                'enabled': True,
+            }
+        )
+
+        # Schedule for purge_report_artifacts (daily at 3 AM)
+        report_purge_schedule, _ = CrontabSchedule.objects.get_or_create(
+            minute='0',
+            hour='3',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+        PeriodicTask.objects.update_or_create(
+            name='Purge report artifacts',
+            defaults={
+                'crontab': report_purge_schedule,
+                'task': 'reports.tasks.purge_report_artifacts',
+                'kwargs': json.dumps({}),
+                'enabled': True,
+            }
+        )
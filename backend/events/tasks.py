@@ -1,65 +1,125 @@
-from celery import shared_task
-from django.core.mail import send_mail
+from celery import shared_task, group
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.utils.html import strip_tags, escape
 from django.conf import settings
 from django.utils import timezone
+from django.db import transaction
 from datetime import timedelta
+from collections import Counter
+from functools import partial
+import time
 from booking.models import Booking
+from booking.reservations import release_hold
 from .models import Event
 
 
+EXPIRY_BATCH_SIZE = 500
+REMINDER_CHUNK_SIZE = 100
+REMINDER_NAME_PLACEHOLDER = '__recipient_name__'
+
+
 @shared_task
-def send_event_reminder_emails():
+def send_event_reminder_emails(chunk_size=REMINDER_CHUNK_SIZE):
     tomorrow = timezone.now().date() + timedelta(days=1)
     tomorrow_events = Event.objects.filter(date=tomorrow, is_completed=False, on_hold=False)
     
-    for event in tomorrow_events:
-        bookings = Booking.objects.filter(event_id=event.eventId)
+    chunks = []
+    for event in tomorrow_events.iterator():
+        # Rendered once per event; each recipient's name is swapped in when the chunk is sent
+        context = {
+            'user_name': REMINDER_NAME_PLACEHOLDER,
+            'event_title': event.title,
+            'event_date': event.date,
+            'event_location': event.location,
+            'year': timezone.now().year
+        }
+        html_message = render_to_string('event_reminder.html', context)
+        plain_message = strip_tags(html_message)
+        subject = f'Reminder: Your event "{event.title}" is tomorrow!'
         
-        for booking in bookings:
-            user_email = booking.user.email if hasattr(booking, 'user') and booking.user else booking.email
-            user_name = booking.user.full_name if hasattr(booking, 'user') and booking.user else booking.booking_name
-            
-            if user_email:
-                context = {
-                    'user_name': user_name,
-                    'event_title': event.title,
-                    'event_date': event.date,
-                    'event_location': event.location,
-                    'year': timezone.now().year
-                }
-                html_message = render_to_string('event_reminder.html', context)
-                plain_message = strip_tags(html_message)
-                
-                send_mail(
-                    f'Reminder: Your event "{event.title}" is tomorrow!',
-                    plain_message,
-                    settings.EMAIL_HOST_USER,
-                    [user_email],
-                    fail_silently=False,
-                    html_message=html_message,
-                )
+        attendees = Booking.objects.filter(
+            event_id=event.eventId, payment_status='confirmed', is_booking_cancelled=False
+        ).values_list('user__email', 'user__full_name')
+        
+        # Group bookings hold several rows per user, but each user gets one reminder
+        seen_emails = set()
+        recipients = []
+        for email, full_name in attendees.iterator(chunk_size=chunk_size):
+            if not email or email in seen_emails:
+                continue
+            seen_emails.add(email)
+            recipients.append((email, full_name))
+            if len(recipients) == chunk_size:
+                chunks.append(send_event_reminder_chunk.s(subject, html_message, plain_message, recipients))
+                recipients = []
+        if recipients:
+            chunks.append(send_event_reminder_chunk.s(subject, html_message, plain_message, recipients))
+    
+    if chunks:
+        group(chunks).apply_async()
+    
+    return f"Queued {len(chunks)} reminder batches for {tomorrow_events.count()} events"
+
+
+@shared_task
+def send_event_reminder_chunk(subject, html_message, plain_message, recipients):
+    messages = []
+    for email, full_name in recipients:
+        message = EmailMultiAlternatives(
+            subject,
+            plain_message.replace(REMINDER_NAME_PLACEHOLDER, full_name),
+            settings.EMAIL_HOST_USER,
+            [email],
+        )
+        message.attach_alternative(html_message.replace(REMINDER_NAME_PLACEHOLDER, escape(full_name)), 'text/html')
+        messages.append(message)
     
-    return f"Processed {tomorrow_events.count()} events for tomorrow"
+    # send_messages opens the SMTP connection once for the whole chunk
+    sent_count = get_connection(fail_silently=False).send_messages(messages)
+    
+    return f"Sent {sent_count} of {len(messages)} reminders"
 
 
 @shared_task
-def cancel_expired_pending_bookings():
-    one_hour_ago = timezone.now() - timedelta(hours=1)
-    pending_bookings = Booking.objects.filter(payment_status='pending', booking_date__lte=one_hour_ago)
+def cancel_expired_pending_bookings(batch_size=EXPIRY_BATCH_SIZE):
+    started = time.monotonic()
+    # Redis already dropped these holds and their seats were never claimed in ticketsSold, so
+    # this only closes the bookings on the same timeout
+    hold_expired_at = timezone.now() - timedelta(seconds=settings.SEAT_HOLD_TTL)
+    expired_bookings = Booking.objects.filter(
+        payment_status__in=['pending', 'failed'], is_booking_cancelled=False, booking_date__lte=hold_expired_at
+    )
     
     cancelled_count = 0
-    for booking in pending_bookings:
-        event = booking.event
-        booking.payment_status = 'cancelled'
-        booking.is_booking_cancelled = True
-        booking.save()
-        
-        event.ticketsSold -= 1
-        event.save()
+    event_ids = set()
+    while True:
+        with transaction.atomic():
+            # Rows locked by a webhook or an overlapping run are skipped and picked up next time
+            batch = list(
+                expired_bookings.select_for_update(skip_locked=True)
+                .order_by('booking_date')
+                .values_list('booking_id', 'event_id', 'group_id')[:batch_size]
+            )
+            if not batch:
+                break
+            
+            Booking.objects.filter(booking_id__in=[booking_id for booking_id, _, _ in batch]).update(
+                payment_status='cancelled', is_booking_cancelled=True, updated_at=timezone.now()
+            )
+            
+            seats_per_hold = Counter((event_id, group_id or booking_id) for booking_id, event_id, group_id in batch)
+            transaction.on_commit(partial(_release_expired_holds, seats_per_hold))
         
-        cancelled_count += 1
+        cancelled_count += len(batch)
+        event_ids.update(event_id for event_id, _ in seats_per_hold)
+        if len(batch) < batch_size:
+            break
     
-    return f"Cancelled {cancelled_count} pending bookings"
+    elapsed = time.monotonic() - started
+    return f"Cancelled {cancelled_count} pending bookings across {len(event_ids)} events in {elapsed:.2f}s"
+
 
+def _release_expired_holds(seats_per_hold):
+    for (event_id, hold_id), quantity in seats_per_hold.items():
+        release_hold(event_id, hold_id, quantity)
@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.db.models import Min, Max
+from datetime import date
+from categories.models import Category
+from users.models import Users
+from events.models import Event
+from .serializers import OrganizerListSerializer
+
+
+FACET_CACHE_TIMEOUT = 60 * 60 * 24
+
+ORGANIZERS_CACHE_KEY = 'homepage:facets:organizers'
+CATEGORIES_CACHE_KEY = 'homepage:facets:categories'
+EVENT_FACETS_CACHE_PREFIX = 'homepage:facets:events'
+
+# Fields whose changes affect the cached facet block, used to skip unrelated saves
+EVENT_FACET_FIELDS = {'date', 'on_hold', 'location', 'pricePerTicket'}
+ORGANIZER_FACET_FIELDS = {'full_name', 'email', 'profile_image', 'role', 'is_blocked'}
+CATEGORY_FACET_FIELDS = {'categoryName', 'is_listed'}
+
+
+def _event_facets_cache_key():
+    # Upcoming-event facets depend on the current date, so the key rolls over daily
+    return f"{EVENT_FACETS_CACHE_PREFIX}:{date.today().isoformat()}"
+
+
+def _build_organizers():
+    organizers = Users.objects.filter(role='organizer', is_blocked=False).distinct()
+    return list(OrganizerListSerializer(organizers, many=True).data)
+
+
+def _build_categories():
+    return list(Category.objects.filter(is_listed=True).values('categoryId', 'categoryName'))
+
+
+def _build_event_facets():
+    upcoming_events = Event.objects.filter(date__gt=date.today(), on_hold=False)
+    locations = upcoming_events.filter(location__isnull=False).exclude(location='').values_list('location', flat=True).distinct()
+    price_range = upcoming_events.aggregate(
+        min_price=Min('pricePerTicket'),
+        max_price=Max('pricePerTicket')
+    )
+
+    return {'locations': list(locations), 'price_range': price_range}
+
+
+def get_event_facets():
+    event_facets_key = _event_facets_cache_key()
+    cached = cache.get_many([ORGANIZERS_CACHE_KEY, CATEGORIES_CACHE_KEY, event_facets_key])
+    missing = {}
+
+    organizers = cached.get(ORGANIZERS_CACHE_KEY)
+    if organizers is None:
+        organizers = _build_organizers()
+        missing[ORGANIZERS_CACHE_KEY] = organizers
+
+    categories = cached.get(CATEGORIES_CACHE_KEY)
+    if categories is None:
+        categories = _build_categories()
+        missing[CATEGORIES_CACHE_KEY] = categories
+
+    event_facets = cached.get(event_facets_key)
+    if event_facets is None:
+        event_facets = _build_event_facets()
+        missing[event_facets_key] = event_facets
+
+    if missing:
+        cache.set_many(missing, timeout=FACET_CACHE_TIMEOUT)
+
+    return {
+        'organizers': organizers,
+        'categories': categories,
+        'locations': event_facets['locations'],
+        'price_range': event_facets['price_range'],
+    }
+
+
+def invalidate_organizer_facets():
+    cache.delete(ORGANIZERS_CACHE_KEY)
+
+
+def invalidate_category_facets():
+    cache.delete(CATEGORIES_CACHE_KEY)
+
+
+def invalidate_event_facets():
+    cache.delete(_event_facets_cache_key())
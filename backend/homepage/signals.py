@@ -0,0 +1,47 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from categories.models import Category
+from users.models import Users
+from events.models import Event
+from .facets import (
+    EVENT_FACET_FIELDS, ORGANIZER_FACET_FIELDS, CATEGORY_FACET_FIELDS,
+    invalidate_event_facets, invalidate_organizer_facets, invalidate_category_facets
+)
+
+
+def _touches(update_fields, relevant_fields):
+    return update_fields is None or bool(set(update_fields) & relevant_fields)
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, EVENT_FACET_FIELDS):
+        invalidate_event_facets()
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    invalidate_event_facets()
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, CATEGORY_FACET_FIELDS):
+        invalidate_category_facets()
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    invalidate_category_facets()
+
+
+@receiver(post_save, sender=Users)
+def organizer_saved(sender, instance, update_fields=None, **kwargs):
+    if instance.role == 'organizer' and _touches(update_fields, ORGANIZER_FACET_FIELDS):
+        invalidate_organizer_facets()
+
+
+@receiver(post_delete, sender=Users)
+def organizer_deleted(sender, instance, **kwargs):
+    if instance.role == 'organizer':
+        invalidate_organizer_facets()
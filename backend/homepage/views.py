@@ -2,19 +2,22 @@ from rest_framework.generics import ListAPIView, RetrieveAPIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import APIException
 from datetime import date, timedelta, datetime
 from rest_framework.decorators import permission_classes
 from rest_framework.permissions import AllowAny
-from django.db.models import Q, Min, Max, Avg
+from django.db.models import Q, Avg
 import logging
-from categories.models import Category
+from eventify.pagination import KeysetPagination
 from users.models import Users
 from events.models import Event
 from events.serializers import EventSerializer
+from events.search import search_events
 from organizers.models import OrganizerProfile
 from organizers.serializers import OrganizerProfileSerializer
 from reviews.models import OrganizerReview
 from .serializers import OrganizerListSerializer
+from .facets import get_event_facets
 
 
 logger = logging.getLogger(__name__)
@@ -25,11 +28,25 @@ class EventPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class EventCursorPagination(KeysetPagination):
+    ordering = ('date', 'eventId')
+    page_size = 12
+
+
 @permission_classes([AllowAny])
 class EventListView(ListAPIView):
     serializer_class = EventSerializer
     pagination_class = EventPagination
     
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = EventCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+    
     def get_queryset(self):
         try:
             queryset = Event.objects.filter(date__gt=date.today(), on_hold=False).select_related('hostedBy', 'category').order_by('date')
@@ -39,7 +56,7 @@ class EventListView(ListAPIView):
                 queryset = queryset.filter(hostedBy__user_id=organizer_id)
             search_query = self.request.query_params.get('search', None)
             if search_query:
-                queryset = queryset.filter(title__istartswith=search_query)
+                queryset = search_events(queryset, search_query)
             start_date = self.request.query_params.get('start_date', None)
             if start_date:
                 try:
@@ -106,6 +123,10 @@ class EventListView(ListAPIView):
     
     def list(self, request, *args, **kwargs):
         try:
+            # Cursor pages seek on (date, eventId), which would silently replace search relevance order
+            if request.query_params.get('pagination') == 'cursor' and request.query_params.get('search'):
+                return Response({'success': False, 'error': 'Cursor pagination cannot be combined with search.'}, status=status.HTTP_400_BAD_REQUEST)
+            
             queryset = self.filter_queryset(self.get_queryset())
             page = self.paginate_queryset(queryset)
             
@@ -116,31 +137,14 @@ class EventListView(ListAPIView):
                 serializer = self.get_serializer(queryset, many=True)
                 events_data = serializer.data
             
-            organizers = Users.objects.filter(role='organizer', is_blocked=False).distinct()
-            organizers_serializer = OrganizerListSerializer(organizers, many=True)
-            
-            categories = Category.objects.filter(is_listed=True).values('categoryId', 'categoryName')
-            
-            locations = Event.objects.filter(
-                date__gt=date.today(),
-                on_hold=False,
-                location__isnull=False
-            ).exclude(location='').values_list('location', flat=True).distinct()
-            
-            price_range = Event.objects.filter(
-                date__gt=date.today(),
-                on_hold=False
-            ).aggregate(
-                min_price=Min('pricePerTicket'),
-                max_price=Max('pricePerTicket')
-            )
+            facets = get_event_facets()
             
             response_data = {
                 'events': events_data,
-                'organizers': organizers_serializer.data,
-                'categories': list(categories),
-                'locations': list(locations),
-                'price_range': price_range,
+                'organizers': facets['organizers'],
+                'categories': facets['categories'],
+                'locations': facets['locations'],
+                'price_range': facets['price_range'],
                 'filters_applied': {
                     'organizer': request.query_params.get('organizer'),
                     'search': request.query_params.get('search'),
@@ -158,13 +162,20 @@ class EventListView(ListAPIView):
                 return self.get_paginated_response(response_data)
             
             return Response(response_data)
+        except APIException:
+            raise
         except Exception as e:
             logger.error(f"Error in EventListView.list: {e}")
             return Response({'success': False, 'error': 'An error occurred while fetching events.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     def get_paginated_response(self, data):
+        if isinstance(self.paginator, EventCursorPagination):
+            count = self.paginator.count
+        else:
+            count = self.paginator.page.paginator.count
+        
         return Response({
-            'count': self.paginator.page.paginator.count,
+            'count': count,
             'next': self.paginator.get_next_link(),
             'previous': self.paginator.get_previous_link(),
             'events': data['events'],
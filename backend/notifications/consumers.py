@@ -1,56 +1,29 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
-from django.contrib.auth import get_user_model
+from .fanout import user_group_name
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
-        self.room_group_name = 'notifications'
-        
-        # Join room group
-        await self.channel_layer.group_add(
-            self.room_group_name,
-            self.channel_name
-        )
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
         
+        # Each user listens on their own group; JWTAuthMiddleware resolved the user from the token
+        self.group_name = user_group_name(user.user_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
     
     async def disconnect(self, close_code):
-        # Leave room group
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
-        )
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
     
-    # Receive message from WebSocket
-    async def receive(self, text_data):
-        text_data_json = json.loads(text_data)
-        message = text_data_json['message']
-        
-        # Send message to room group
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'notification_message',
-                'message': message
-            }
-        )
+    # Notifications only flow server to client; anything the client sends is ignored
+    async def receive(self, text_data=None, bytes_data=None):
+        pass
     
-    # Receive message from room group
-    async def notification_message(self, event):
-        message = event['message']
-        
-        # Send message to WebSocket
+    async def send_notification(self, event):
         await self.send(text_data=json.dumps({
-            'message': message
+            'message': event['notification']
         }))
-
-    @database_sync_to_async
-    def get_user(self, user_id):
-        User = get_user_model()
-        try:
-            return User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            return None
-
@@ -0,0 +1,55 @@
+from django.db import transaction
+from channels.layers import get_channel_layer
+from asgiref.sync import async_to_sync
+from itertools import islice
+import asyncio, logging
+from .models import Notification
+
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_BATCH_SIZE = 500
+
+
+def user_group_name(user_id):
+    return f'notifications_{user_id}'
+
+
+def notify_users(user_ids, notification_type, message, data=None):
+    # Rows are written in batches and each batch is pushed live once it commits, so a fan-out to
+    # every user never holds the whole audience in memory; offline users read the rows later
+    user_ids = iter(user_ids)
+    total = 0
+    while True:
+        batch = list(islice(user_ids, NOTIFICATION_BATCH_SIZE))
+        if not batch:
+            return total
+
+        notifications = Notification.objects.bulk_create([
+            Notification(user_id=user_id, notification_type=notification_type, message=message, data=data or {})
+            for user_id in batch
+        ])
+        transaction.on_commit(lambda notifications=notifications: broadcast_notifications(notifications))
+        total += len(notifications)
+
+
+def broadcast_notifications(notifications):
+    try:
+        async_to_sync(_send_all)(notifications)
+    except Exception as e:
+        logger.error(f"Error broadcasting notifications: {e}")
+
+
+async def _send_all(notifications):
+    channel_layer = get_channel_layer()
+    results = await asyncio.gather(*[
+        channel_layer.group_send(user_group_name(notification.user_id), {
+            'type': 'send_notification',
+            'notification': notification.to_payload(),
+        })
+        for notification in notifications
+    ], return_exceptions=True)
+
+    failed = [result for result in results if isinstance(result, Exception)]
+    if failed:
+        logger.error(f"{len(failed)} of {len(notifications)} notifications were not pushed: {failed[0]}")
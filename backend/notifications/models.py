@@ -1,3 +1,73 @@
 from django.db import models
+from django.utils import timezone
+from django.conf import settings
+import uuid
+
 
 # Create your models here.
+
+
+class EmailOutbox(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    
+    outbox_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, null=True)
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_attempt_at'], condition=models.Q(status='pending'), name='outbox_pending_due_idx'),
+            models.Index(fields=['status', 'sent_at'], name='outbox_status_sent_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+
+class Notification(models.Model):
+    NOTIFICATION_TYPES = (
+        ('new_event', 'New Event'),
+        ('new_message', 'New Message'),
+    )
+    
+    notification_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
+    notification_type = models.CharField(max_length=30, choices=NOTIFICATION_TYPES)
+    message = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'notification_id'], name='notification_user_created_idx'),
+            models.Index(fields=['user'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.notification_type} for {self.user_id}"
+    
+    def to_payload(self):
+        # Flat shape the web client already consumes, extended with the stored id and read state
+        return {
+            **self.data,
+            'notification_id': str(self.notification_id),
+            'type': self.notification_type,
+            'message': self.message,
+            'is_read': self.is_read,
+            'timestamp': self.created_at.isoformat(),
+        }
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Max, Min, Count, Q, F
+from django.utils import timezone
+from django.utils.html import strip_tags
+from datetime import timedelta
+import logging
+from .models import EmailOutbox
+
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, html_message, recipients, from_email=None):
+    outbox = EmailOutbox.objects.create(
+        subject=subject,
+        body=strip_tags(html_message),
+        html_body=html_message,
+        from_email=from_email or settings.EMAIL_HOST_USER,
+        recipients=list(recipients),
+    )
+    # Deliver as soon as the row is visible; the periodic run picks it up if the broker is down
+    transaction.on_commit(_kick_delivery)
+    return outbox
+
+
+def _kick_delivery():
+    from .tasks import deliver_email_outbox
+
+    try:
+        deliver_email_outbox.delay()
+    except Exception as e:
+        logger.error(f"Could not schedule email outbox delivery: {e}")
+
+
+def outbox_metrics(window=timedelta(hours=1)):
+    now = timezone.now()
+    queue = EmailOutbox.objects.aggregate(
+        pending=Count('outbox_id', filter=Q(status='pending')),
+        retrying=Count('outbox_id', filter=Q(status='pending', attempts__gt=0)),
+        failed=Count('outbox_id', filter=Q(status='failed')),
+        oldest_pending=Min('created_at', filter=Q(status='pending')),
+    )
+    latency = EmailOutbox.objects.filter(status='sent', sent_at__gte=now - window).aggregate(
+        sent=Count('outbox_id'),
+        avg_latency=Avg(F('sent_at') - F('created_at')),
+        max_latency=Max(F('sent_at') - F('created_at')),
+    )
+    
+    return {
+        'queue_depth': queue['pending'],
+        'retrying': queue['retrying'],
+        'failed': queue['failed'],
+        'oldest_pending_age_seconds': (now - queue['oldest_pending']).total_seconds() if queue['oldest_pending'] else 0,
+        'sent_last_hour': latency['sent'],
+        'avg_send_latency_seconds': latency['avg_latency'].total_seconds() if latency['avg_latency'] else 0,
+        'max_send_latency_seconds': latency['max_latency'].total_seconds() if latency['max_latency'] else 0,
+    }
@@ -0,0 +1,129 @@
+from celery import shared_task
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from datetime import timedelta
+import logging, time
+from events.models import Event
+from users.models import Users
+from .models import EmailOutbox
+from .fanout import notify_users, NOTIFICATION_BATCH_SIZE
+
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_RETRY_BASE_DELAY = 30
+OUTBOX_LEASE = timedelta(minutes=5)
+OUTBOX_SENT_RETENTION_HOURS = 24
+OUTBOX_FAILED_RETENTION_DAYS = 7
+
+
+@shared_task
+def deliver_email_outbox(batch_size=OUTBOX_BATCH_SIZE):
+    started = time.monotonic()
+    sent_count = failed_count = 0
+    # One SMTP connection is opened per run and reused by every batch it sends
+    connection = get_connection(fail_silently=False)
+    
+    try:
+        while True:
+            batch = _claim_batch(batch_size)
+            if not batch:
+                break
+            
+            sent, failed = _send_batch(connection, batch)
+            sent_count += sent
+            failed_count += failed
+            if len(batch) < batch_size:
+                break
+    finally:
+        connection.close()
+    
+    elapsed = time.monotonic() - started
+    return f"Sent {sent_count} emails, {failed_count} failed in {elapsed:.2f}s"
+
+
+def _claim_batch(batch_size):
+    now = timezone.now()
+    with transaction.atomic():
+        outbox_ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('outbox_id', flat=True)[:batch_size]
+        )
+        # Pushing next_attempt_at out acts as a lease: if this worker dies, the rows come due again
+        EmailOutbox.objects.filter(outbox_id__in=outbox_ids).update(
+            attempts=F('attempts') + 1, next_attempt_at=now + OUTBOX_LEASE
+        )
+    return list(EmailOutbox.objects.filter(outbox_id__in=outbox_ids))
+
+
+def _send_batch(connection, batch):
+    sent_ids = []
+    failed = 0
+    for outbox in batch:
+        message = EmailMultiAlternatives(
+            outbox.subject, outbox.body, outbox.from_email, outbox.recipients, connection=connection
+        )
+        if outbox.html_body:
+            message.attach_alternative(outbox.html_body, 'text/html')
+        
+        try:
+            # No-op while the connection is alive; opening it here keeps send() from closing it after each message
+            connection.open()
+            message.send()
+            sent_ids.append(outbox.outbox_id)
+        except Exception as e:
+            logger.error(f"Error sending outbox email {outbox.outbox_id}: {e}")
+            _schedule_retry(outbox, e)
+            failed += 1
+            # The server may have dropped us, so the next message starts on a fresh connection
+            connection.close()
+    
+    # Bodies carry OTPs and reset links, so they are dropped as soon as the mail is out
+    EmailOutbox.objects.filter(outbox_id__in=sent_ids).update(
+        status='sent', sent_at=timezone.now(), last_error=None, body='', html_body=None
+    )
+    return len(sent_ids), failed
+
+
+def _schedule_retry(outbox, error):
+    if outbox.attempts >= OUTBOX_MAX_ATTEMPTS:
+        outbox.status = 'failed'
+    else:
+        outbox.next_attempt_at = timezone.now() + timedelta(seconds=OUTBOX_RETRY_BASE_DELAY * 2 ** (outbox.attempts - 1))
+    outbox.last_error = str(error)
+    outbox.save(update_fields=['status', 'next_attempt_at', 'last_error'])
+
+
+@shared_task
+def purge_email_outbox(sent_max_age_hours=OUTBOX_SENT_RETENTION_HOURS, failed_max_age_days=OUTBOX_FAILED_RETENTION_DAYS):
+    started = time.monotonic()
+    now = timezone.now()
+    sent_count, _ = EmailOutbox.objects.filter(status='sent', sent_at__lt=now - timedelta(hours=sent_max_age_hours)).delete()
+    failed_count, _ = EmailOutbox.objects.filter(status='failed', created_at__lt=now - timedelta(days=failed_max_age_days)).delete()
+    
+    elapsed = time.monotonic() - started
+    return f"Purged {sent_count} sent and {failed_count} failed outbox emails in {elapsed:.2f}s"
+
+
+@shared_task
+def fan_out_event_notification(event_id):
+    event = Event.objects.filter(eventId=event_id).first()
+    if event is None:
+        return f"Event {event_id} not found"
+    
+    started = time.monotonic()
+    user_ids = Users.objects.filter(is_blocked=False).exclude(user_id=event.hostedBy_id).values_list(
+        'user_id', flat=True
+    ).iterator(chunk_size=NOTIFICATION_BATCH_SIZE)
+    sent_count = notify_users(user_ids, 'new_event', f'A new event "{event.title}" has just been published. Check it out!', {
+        'event_id': str(event.eventId),
+        'title': event.title,
+        'image': event.posterImage or None,
+    })
+    return f"Notified {sent_count} users about event {event_id} in {time.monotonic() - started:.2f}s"
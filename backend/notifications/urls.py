@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import NotificationListView, MarkNotificationsReadView
+
+
+urlpatterns = [
+    path('', NotificationListView.as_view(), name='notifications'),
+    path('mark_read/', MarkNotificationsReadView.as_view(), name='mark-notifications-read'),
+]
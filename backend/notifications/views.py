@@ -1,3 +1,59 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.exceptions import NotFound
+from django.core.exceptions import ValidationError
+import logging
+from eventify.pagination import AnchoredKeysetPagination
+from .models import Notification
 
-# Create your views here.
+
+logger = logging.getLogger(__name__)
+
+class NotificationPagination(AnchoredKeysetPagination):
+    # Newest first; a reconnecting client passes ?since=<last notification_id it has> and
+    # follows the previous link until it is null to catch up on everything it missed
+    ordering = ('-created_at', '-notification_id')
+    anchor_field = 'notification_id'
+    after_query_param = 'since'
+    page_size = 20
+    max_page_size = 100
+
+
+@permission_classes([IsAuthenticated])
+class NotificationListView(APIView):
+    def get(self, request):
+        try:
+            notifications = Notification.objects.filter(user=request.user)
+            paginator = NotificationPagination()
+            result_page = paginator.paginate_queryset(notifications, request)
+            response = paginator.get_paginated_response([notification.to_payload() for notification in result_page])
+            response.data['unread_count'] = notifications.filter(is_read=False).count()
+            return response
+        except NotFound as e:
+            return Response({'error': str(e.detail)}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.error(f"Error fetching notifications: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@permission_classes([IsAuthenticated])
+class MarkNotificationsReadView(APIView):
+    def post(self, request):
+        try:
+            notifications = Notification.objects.filter(user=request.user, is_read=False)
+            notification_ids = request.data.get('notification_ids')
+            if notification_ids:
+                notifications = notifications.filter(notification_id__in=notification_ids)
+            
+            updated_count = notifications.update(is_read=True)
+            unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
+            
+            return Response({'marked_read': updated_count, 'unread_count': unread_count}, status=status.HTTP_200_OK)
+        except ValidationError:
+            return Response({'error': 'Invalid notification id'}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Error marking notifications as read: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -6,6 +6,34 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.enums import TA_CENTER
+from eventify.exports import column_rows, stream_csv, stream_xlsx
+
+
+BOOKING_COLUMNS = [
+    ('booking_id', 'Booking ID'),
+    ('booking_name', 'Booking Name'),
+    ('total_price', 'Total Amount'),
+    ('booking_date', 'Booking Date'),
+    ('payment_date', 'Payment Date'),
+    ('payment_status', 'Payment Status'),
+    ('event__title', 'Event Title'),
+    ('event__date', 'Event Date'),
+    ('user__full_name', 'Customer Name'),
+    ('user__email', 'Customer Email'),
+    ('notes', 'Notes'),
+    ('organizer_amount', 'Your Share (90%)'),
+    ('platform_fee', 'Platform Fee (10%)'),
+]
+
+EVENT_REVENUE_COLUMNS = [
+    ('event__title', 'Event Title'),
+    ('event__date', 'Event Date'),
+    ('event__pricePerTicket', 'Ticket Price'),
+    ('total_bookings', 'Total Bookings'),
+    ('total_revenue', 'Total Revenue'),
+    ('organizer_revenue', 'Your Share (90%)'),
+    ('platform_fee', 'Platform Fee (10%)'),
+]
 
 
 class OrganizerExcelGenerator:
@@ -21,10 +49,20 @@ class OrganizerExcelGenerator:
         buffer.seek(0)
         return buffer
     
-    def _create_summary_sheet(self, writer, report_data):
+    def stream_revenue_report(self, report_data):
+        # Same sheets as generate_revenue_report, but bookings are written as they are fetched
+        return stream_xlsx([
+            ('Summary', ['Metric', 'Value'], self._summary_rows(report_data)),
+            ('Detailed Bookings', [label for _, label in BOOKING_COLUMNS], column_rows(report_data['bookings'], BOOKING_COLUMNS)),
+            ('Revenue by Event', [label for _, label in EVENT_REVENUE_COLUMNS],
+             column_rows(report_data['event_revenue'], EVENT_REVENUE_COLUMNS)),
+            ('Revenue Split Analysis', ['Component', 'Amount', 'Percentage'], self._split_rows(report_data)),
+        ])
+    
+    def _summary_rows(self, report_data):
         summary = report_data['summary']
         
-        summary_data = [
+        return [
             ['Organizer Revenue Report', ''],
             ['', ''],
             ['Organizer Name', summary['organizer_name']],
@@ -41,8 +79,9 @@ class OrganizerExcelGenerator:
             ['Organizer Percentage', f"{summary['revenue_split']['organizer']}%"],
             ['Platform Percentage', f"{summary['revenue_split']['platform']}%"],
         ]
-        
-        df = pd.DataFrame(summary_data, columns=['Metric', 'Value'])
+    
+    def _create_summary_sheet(self, writer, report_data):
+        df = pd.DataFrame(self._summary_rows(report_data), columns=['Metric', 'Value'])
         df.to_excel(writer, sheet_name='Summary', index=False)
     
     def _create_bookings_sheet(self, writer, report_data):
@@ -85,10 +124,10 @@ class OrganizerExcelGenerator:
             events_df = events_df.rename(columns=column_mapping)
             events_df.to_excel(writer, sheet_name='Revenue by Event', index=False)
     
-    def _create_revenue_split_sheet(self, writer, report_data):
+    def _split_rows(self, report_data):
         summary = report_data['summary']
         
-        split_data = [
+        return [
             ['Revenue Split Analysis', '', ''],
             ['', '', ''],
             ['Component', 'Amount (₹)', 'Percentage'],
@@ -99,11 +138,17 @@ class OrganizerExcelGenerator:
             ['Note:', 'Platform fee covers payment processing,', ''],
             ['', 'hosting, and customer support services.', ''],
         ]
-        
-        df = pd.DataFrame(split_data, columns=['Component', 'Amount', 'Percentage'])
+    
+    def _create_revenue_split_sheet(self, writer, report_data):
+        df = pd.DataFrame(self._split_rows(report_data), columns=['Component', 'Amount', 'Percentage'])
         df.to_excel(writer, sheet_name='Revenue Split Analysis', index=False)
 
 
+class OrganizerCSVGenerator:
+    def stream_revenue_report(self, report_data):
+        return stream_csv([label for _, label in BOOKING_COLUMNS], column_rows(report_data['bookings'], BOOKING_COLUMNS))
+
+
 class OrganizerPDFGenerator:
     def __init__(self):
         self.styles = getSampleStyleSheet()
@@ -1,7 +1,8 @@
 from django.urls import path
 from .views import (
     OrganizerProfileView, OrganizerEventsView, OrganizerEventUpdateView, OrganizerBookingsView,
-    OrganizerDashboardView, OrganizerRevenueReportViewPDF, OrganizerRevenueReportViewExcel
+    OrganizerDashboardView, OrganizerRevenueReportViewPDF, OrganizerRevenueReportViewExcel,
+    OrganizerRevenueReportViewCSV
 )
 
 
@@ -9,6 +10,7 @@ urlpatterns = [
     path('dashboard/', OrganizerDashboardView.as_view(), name='organizer-dashboard'),
     path('download-report-pdf/', OrganizerRevenueReportViewPDF.as_view(), name='organizer-download-report-pdf'),
     path('download-report-excel/', OrganizerRevenueReportViewExcel.as_view(), name='organizer-download-report-excel'),
+    path('download-report-csv/', OrganizerRevenueReportViewCSV.as_view(), name='organizer-download-report-csv'),
     path('profile/', OrganizerProfileView.as_view(), name='organizer-profile'),
     path('organizer-events/', OrganizerEventsView.as_view(), name='organizer-events'),
     path('<uuid:pk>/', OrganizerEventUpdateView.as_view(), name='event-update'),
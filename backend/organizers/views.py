@@ -8,17 +8,22 @@ from django.utils import timezone
 from datetime import datetime, timedelta, date
 from django.http import HttpResponse
 from decimal import Decimal
+from collections import defaultdict
 from rest_framework.permissions import IsAuthenticated
 from dateutil.parser import parse as parse_date
 from events.serializers import EventSerializer
+from events.search import search_events
 import cloudinary, cloudinary.uploader, logging
-from booking.models import Booking
+from eventify.pagination import KeysetPagination
+from eventify.exports import streaming_export, EXPORT_CHUNK_SIZE, CSV_CONTENT_TYPE, XLSX_CONTENT_TYPE
+from booking.models import Booking, DailyBookingRollup
+from booking.rollups import booking_totals, booking_series
 from events.models import Event
 from .permissions import IsOrganizerUser
 from .validators import validate_event
 from .serializers import OrganizerBookingSerializer, OrganizerEventSerializer
 from .models import OrganizerProfile
-from .organizer_report_generators import OrganizerExcelGenerator, OrganizerPDFGenerator
+from .organizer_report_generators import OrganizerExcelGenerator, OrganizerPDFGenerator, OrganizerCSVGenerator
 
 
 logger = logging.getLogger(__name__)
@@ -50,14 +55,17 @@ class OrganizerDashboardView(APIView):
         bookings_qs = Booking.objects.filter(event__hostedBy=user).select_related(
             'event', 'user', 'event__category'
         )
+        rollups_qs = DailyBookingRollup.objects.filter(organizer=user)
         
-        events_qs, bookings_qs = self._apply_filters(events_qs, bookings_qs, filters)
-        events_data = self._get_events_with_revenue(events_qs, bookings_qs)
+        event_totals = self._get_event_totals(rollups_qs, Booking.objects.filter(event__hostedBy=user))
+        events_qs, bookings_qs, rollups_qs = self._apply_filters(user, events_qs, bookings_qs, rollups_qs, filters)
+        status_totals = self._get_status_totals(rollups_qs, bookings_qs)
+        events_data = self._get_events_with_revenue(events_qs, event_totals)
         bookings_data = self._get_bookings_data(bookings_qs)
-        revenue_summary = self._get_revenue_summary(bookings_qs)
-        booking_summary = self._get_booking_summary(bookings_qs)
+        revenue_summary = self._get_revenue_summary(status_totals)
+        booking_summary = self._get_booking_summary(status_totals)
         monthly_revenue = self._get_monthly_revenue(user, filters)
-        top_events = self._get_top_events(user, filters)
+        top_events = self._get_top_events(user, event_totals)
         
         return {
             'events': events_data,
@@ -68,13 +76,15 @@ class OrganizerDashboardView(APIView):
             'top_events': top_events
         }
     
-    def _apply_filters(self, events_qs, bookings_qs, filters):
+    def _apply_filters(self, user, events_qs, bookings_qs, rollups_qs, filters):
         if filters['start_date']:
             start_date = datetime.strptime(filters['start_date'], '%Y-%m-%d').date()
             bookings_qs = bookings_qs.filter(booking_date__date__gte=start_date)
+            rollups_qs = rollups_qs.filter(day__gte=start_date)
         if filters['end_date']:
             end_date = datetime.strptime(filters['end_date'], '%Y-%m-%d').date()
             bookings_qs = bookings_qs.filter(booking_date__date__lte=end_date)
+            rollups_qs = rollups_qs.filter(day__lte=end_date)
         if filters['event_status']:
             today = timezone.now().date()
             if filters['event_status'] == 'completed':
@@ -85,61 +95,64 @@ class OrganizerDashboardView(APIView):
                 events_qs = events_qs.filter(on_hold=True)
         if filters['payment_status']:
             bookings_qs = bookings_qs.filter(payment_status=filters['payment_status'])
+            rollups_qs = rollups_qs.filter(payment_status=filters['payment_status'])
         if filters['event_id']:
             events_qs = events_qs.filter(eventId=filters['event_id'])
             bookings_qs = bookings_qs.filter(event__eventId=filters['event_id'])
+            rollups_qs = rollups_qs.filter(event_id=filters['event_id'])
         if filters['search']:
-            search_q = Q(title__icontains=filters['search']) | \
-                      Q(category__categoryName__icontains=filters['search']) | \
-                      Q(location__icontains=filters['search'])
-            events_qs = events_qs.filter(search_q)
+            events_qs = search_events(events_qs, filters['search'], ranked=False)
             
-            booking_search_q = Q(event__title__icontains=filters['search']) | \
+            matching_events = search_events(Event.objects.filter(hostedBy=user), filters['search'], ranked=False)
+            booking_search_q = Q(event__in=matching_events.values('eventId')) | \
                               Q(booking_name__icontains=filters['search']) | \
                               Q(user__full_name__icontains=filters['search'])
             bookings_qs = bookings_qs.filter(booking_search_q)
+            # Rollups can't match booking names, so searched summaries are totalled from the bookings
+            rollups_qs = None
         
-        return events_qs, bookings_qs
+        return events_qs, bookings_qs, rollups_qs
     
-    def _get_events_with_revenue(self, events_qs, bookings_qs):
-        events = events_qs.annotate(
-            total_revenue=Sum(
-                'bookings__total_price',
-                filter=Q(bookings__payment_status='confirmed')
-            ),
-            confirmed_bookings=Count(
-                'bookings',
-                filter=Q(bookings__payment_status='confirmed')
-            ),
-            pending_bookings=Count(
-                'bookings',
-                filter=Q(bookings__payment_status='pending')
-            ),
-            cancelled_bookings=Count(
-                'bookings',
-                filter=Q(bookings__payment_status='cancelled')
+    def _get_event_totals(self, rollups_qs, bookings_qs):
+        totals = defaultdict(dict)
+        for row in booking_totals(rollups_qs, bookings_qs, ['event_id', 'payment_status']):
+            totals[row['event_id']][row['payment_status']] = row
+        return totals
+    
+    def _get_status_totals(self, rollups_qs, bookings_qs):
+        if rollups_qs is None:
+            rows = bookings_qs.order_by().values('payment_status').annotate(
+                bookings=Count('booking_id'),
+                revenue=Sum('total_price')
             )
-        ).order_by('-createdAt')
+        else:
+            rows = booking_totals(rollups_qs, bookings_qs, ['payment_status'])
+        return {row['payment_status']: row for row in rows}
+    
+    def _get_events_with_revenue(self, events_qs, event_totals):
+        events = list(events_qs.order_by('-createdAt'))
+        for event in events:
+            self._attach_totals(event, event_totals[event.eventId])
         
         return OrganizerEventSerializer(events, many=True).data
     
+    def _attach_totals(self, event, totals):
+        event.total_revenue = totals['confirmed']['revenue'] if 'confirmed' in totals else None
+        event.confirmed_bookings = totals.get('confirmed', {}).get('bookings', 0)
+        event.pending_bookings = totals.get('pending', {}).get('bookings', 0)
+        event.cancelled_bookings = totals.get('cancelled', {}).get('bookings', 0)
+    
     def _get_bookings_data(self, bookings_qs):
         bookings = bookings_qs.order_by('-booking_date')
         return OrganizerBookingSerializer(bookings, many=True).data
     
-    def _get_revenue_summary(self, bookings_qs):
-        confirmed_bookings = bookings_qs.filter(payment_status='confirmed')
-        
-        total_revenue = confirmed_bookings.aggregate(
-            total=Sum('total_price')
-        )['total'] or 0
+    def _get_revenue_summary(self, status_totals):
+        total_revenue = status_totals.get('confirmed', {}).get('revenue') or 0
         
         organizer_revenue = round(Decimal(str(total_revenue)) * Decimal('0.90'), 2)
         platform_fee = round(Decimal(str(total_revenue)) * Decimal('0.10'), 2)
         
-        pending_revenue = bookings_qs.filter(payment_status='pending').aggregate(
-            total=Sum('total_price')
-        )['total'] or 0
+        pending_revenue = status_totals.get('pending', {}).get('revenue') or 0
         
         return {
             'total_revenue': float(total_revenue),
@@ -152,59 +165,47 @@ class OrganizerDashboardView(APIView):
             }
         }
     
-    def _get_booking_summary(self, bookings_qs):
-        summary = bookings_qs.aggregate(
-            total_bookings=Count('booking_id'),
-            confirmed_bookings=Count('booking_id', filter=Q(payment_status='confirmed')),
-            pending_bookings=Count('booking_id', filter=Q(payment_status='pending')),
-            cancelled_bookings=Count('booking_id', filter=Q(payment_status='cancelled'))
-        )
-        
-        return summary
+    def _get_booking_summary(self, status_totals):
+        return {
+            'total_bookings': sum(row['bookings'] for row in status_totals.values()),
+            'confirmed_bookings': status_totals.get('confirmed', {}).get('bookings', 0),
+            'pending_bookings': status_totals.get('pending', {}).get('bookings', 0),
+            'cancelled_bookings': status_totals.get('cancelled', {}).get('bookings', 0)
+        }
     
     def _get_monthly_revenue(self, user, filters):
         end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=365)
-        monthly_data = []
-        current_date = start_date.replace(day=1)
+        start_date = (end_date - timedelta(days=365)).replace(day=1)
+        series = booking_series(
+            DailyBookingRollup.objects.filter(organizer=user, payment_status='confirmed'),
+            Booking.objects.filter(event__hostedBy=user, payment_status='confirmed'),
+            'month', start_date, end_date
+        )
         
-        while current_date <= end_date:
-            next_month = (current_date.replace(day=28) + timedelta(days=4)).replace(day=1)
-            
-            month_bookings = Booking.objects.filter(
-                event__hostedBy=user,
-                payment_status='confirmed',
-                booking_date__date__gte=current_date,
-                booking_date__date__lt=next_month
-            )
-            
-            total_revenue = month_bookings.aggregate(Sum('total_price'))['total_price__sum'] or 0
-            organizer_revenue = round(Decimal(str(total_revenue)) * Decimal('0.90'), 2)
-            
+        monthly_data = []
+        for month in series:
+            organizer_revenue = round(Decimal(str(month['revenue'])) * Decimal('0.90'), 2)
             monthly_data.append({
-                'month': current_date.strftime('%Y-%m'),
-                'month_name': current_date.strftime('%B %Y'),
-                'total_revenue': float(total_revenue),
+                'month': month['month'].strftime('%Y-%m'),
+                'month_name': month['month'].strftime('%B %Y'),
+                'total_revenue': float(month['revenue']),
                 'organizer_revenue': float(organizer_revenue),
-                'bookings_count': month_bookings.count()
+                'bookings_count': month['bookings']
             })
-            
-            current_date = next_month
         return monthly_data
     
-    def _get_top_events(self, user, filters):
-        events = Event.objects.filter(hostedBy=user).annotate(
-            total_revenue=Sum(
-                'bookings__total_price',
-                filter=Q(bookings__payment_status='confirmed')
-            ),
-            confirmed_bookings=Count(
-                'bookings',
-                filter=Q(bookings__payment_status='confirmed')
-            )
-        ).filter(total_revenue__gt=0).order_by('-total_revenue')[:5]
+    def _get_top_events(self, user, event_totals):
+        top = sorted(
+            (event_id for event_id, totals in event_totals.items() if totals.get('confirmed', {}).get('revenue', 0) > 0),
+            key=lambda event_id: event_totals[event_id]['confirmed']['revenue'], reverse=True
+        )[:5]
+        events = Event.objects.filter(hostedBy=user).in_bulk(top)
         
-        return OrganizerEventSerializer(events, many=True).data
+        top_events = [events[event_id] for event_id in top if event_id in events]
+        for event in top_events:
+            self._attach_totals(event, event_totals[event.eventId])
+        
+        return OrganizerEventSerializer(top_events, many=True).data
 
 
 @permission_classes([IsOrganizerUser])
@@ -214,7 +215,9 @@ class OrganizerRevenueReportViewPDF(APIView):
             bookings_qs = Booking.objects.filter(
                 event__hostedBy=request.user
             ).select_related('event', 'user', 'event__category')
-            report_data = prepare_report_data(request.user, bookings_qs)
+            rollups_qs = DailyBookingRollup.objects.filter(organizer=request.user)
+            # The PDF only prints totals, so the booking rows are left unfetched
+            report_data = prepare_report_data(request.user, bookings_qs, rollups_qs, stream=True)
             
             pdf_generator = OrganizerPDFGenerator()
             pdf_buffer = pdf_generator.generate_revenue_report(report_data)
@@ -235,7 +238,16 @@ class OrganizerRevenueReportViewExcel(APIView):
             bookings_qs = Booking.objects.filter(
                 event__hostedBy=request.user
             ).select_related('event', 'user', 'event__category')
-            report_data = prepare_report_data(request.user, bookings_qs)
+            rollups_qs = DailyBookingRollup.objects.filter(organizer=request.user)
+            
+            if request.GET.get('stream') == 'true':
+                report_data = prepare_report_data(request.user, bookings_qs, rollups_qs, stream=True)
+                return streaming_export(
+                    request, OrganizerExcelGenerator().stream_revenue_report(report_data),
+                    f'organizer_revenue_report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx', XLSX_CONTENT_TYPE
+                )
+            
+            report_data = prepare_report_data(request.user, bookings_qs, rollups_qs)
             
             excel_generator = OrganizerExcelGenerator()
             excel_buffer = excel_generator.generate_revenue_report(report_data)
@@ -252,8 +264,26 @@ class OrganizerRevenueReportViewExcel(APIView):
             return Response({"success": False, "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-def prepare_report_data(user, bookings_qs):
-    total_revenue = bookings_qs.aggregate(Sum('total_price'))['total_price__sum'] or 0
+@permission_classes([IsOrganizerUser])
+class OrganizerRevenueReportViewCSV(APIView):
+    def get(self, request):
+        try:
+            bookings_qs = Booking.objects.filter(event__hostedBy=request.user)
+            rollups_qs = DailyBookingRollup.objects.filter(organizer=request.user)
+            report_data = prepare_report_data(request.user, bookings_qs, rollups_qs, stream=True)
+            
+            return streaming_export(
+                request, OrganizerCSVGenerator().stream_revenue_report(report_data),
+                f'organizer_revenue_report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv', CSV_CONTENT_TYPE
+            )
+        except Exception as e:
+            logger.error(f"Error generating CSV report: {str(e)}")
+            return Response({"success": False, "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def prepare_report_data(user, bookings_qs, rollups_qs, stream=False):
+    event_totals = booking_totals(rollups_qs, bookings_qs, ['event_id'])
+    total_revenue = sum(row['revenue'] for row in event_totals)
     organizer_revenue = round(Decimal(str(total_revenue)) * Decimal('0.90'), 2)
     platform_fee = round(Decimal(str(total_revenue)) * Decimal('0.10'), 2)
     generated_at = safe_make_naive(timezone.now())
@@ -261,7 +291,7 @@ def prepare_report_data(user, bookings_qs):
     summary = {
         'organizer_name': user.full_name,
         'organizer_email': user.email,
-        'total_bookings': bookings_qs.count(),
+        'total_bookings': sum(row['bookings'] for row in event_totals),
         'total_revenue': float(total_revenue),
         'organizer_revenue': float(organizer_revenue),
         'platform_fee': float(platform_fee),
@@ -279,29 +309,25 @@ def prepare_report_data(user, bookings_qs):
         'user__full_name', 'user__email', 'notes'
     ).order_by('-booking_date')
     
-    enhanced_bookings = []
-    for booking in bookings_data:
-        for field in ['booking_date', 'payment_date', 'event__date']:
-            if field in booking:
-                booking[field] = safe_make_naive(booking[field])
-        
-        booking['organizer_amount'] = float(round(Decimal(str(booking['total_price'])) * Decimal('0.90'), 2))
-        booking['platform_fee'] = float(round(Decimal(str(booking['total_price'])) * Decimal('0.10'), 2))
-        enhanced_bookings.append(booking)
+    if stream:
+        # Rows are fetched in chunks only as an export writes them out
+        enhanced_bookings = (_enhance_booking(booking) for booking in bookings_data.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+    else:
+        enhanced_bookings = [_enhance_booking(booking) for booking in bookings_data]
     
-    event_revenue = bookings_qs.values(
-        'event__title', 'event__date', 'event__pricePerTicket'
-    ).annotate(
-        total_bookings=Count('booking_id'),
-        total_revenue=Sum('total_price'),
-        organizer_revenue=Sum('total_price') * Decimal('0.90'),
-        platform_fee=Sum('total_price') * Decimal('0.10')
-    ).order_by('-total_revenue')
-
-    event_revenue_list = list(event_revenue)
-    for event in event_revenue_list:
-        if 'event__date' in event:
-            event['event__date'] = safe_make_naive(event['event__date'])
+    events = Event.objects.in_bulk({row['event_id'] for row in event_totals})
+    event_revenue_list = []
+    for row in sorted(event_totals, key=lambda row: row['revenue'], reverse=True):
+        event = events[row['event_id']]
+        event_revenue_list.append({
+            'event__title': event.title,
+            'event__date': safe_make_naive(event.date),
+            'event__pricePerTicket': event.pricePerTicket,
+            'total_bookings': row['bookings'],
+            'total_revenue': row['revenue'],
+            'organizer_revenue': Decimal(row['revenue']) * Decimal('0.90'),
+            'platform_fee': Decimal(row['revenue']) * Decimal('0.10'),
+        })
     
     return {
         'summary': summary,
@@ -310,6 +336,16 @@ def prepare_report_data(user, bookings_qs):
     }
 
 
+def _enhance_booking(booking):
+    for field in ['booking_date', 'payment_date', 'event__date']:
+        if field in booking:
+            booking[field] = safe_make_naive(booking[field])
+    
+    booking['organizer_amount'] = float(round(Decimal(str(booking['total_price'])) * Decimal('0.90'), 2))
+    booking['platform_fee'] = float(round(Decimal(str(booking['total_price'])) * Decimal('0.10'), 2))
+    return booking
+
+
 def safe_make_naive(dt_obj):
     if dt_obj is None:
         return None
@@ -400,6 +436,11 @@ class EventPagination(PageNumberPagination):
     page_query_param = 'page'
 
 
+class EventCursorPagination(KeysetPagination):
+    ordering = ('-date', '-eventId')
+    page_size = 10
+
+
 @permission_classes([IsOrganizerUser])
 class OrganizerEventsView(APIView):
     pagination_class = EventPagination
@@ -412,6 +453,13 @@ class OrganizerEventsView(APIView):
             is_completed = is_completed.lower() == 'true'
             events = events.filter(is_completed=is_completed)
         
+        if request.query_params.get('pagination') == 'cursor':
+            paginator = EventCursorPagination()
+            paginated_events = paginator.paginate_queryset(events, request)
+            serializer = EventSerializer(paginated_events, many=True)
+            
+            return paginator.get_paginated_response({'success': True, 'events': serializer.data})
+        
         events = events.order_by('-date')
         paginator = self.pagination_class()
         paginated_events = paginator.paginate_queryset(events, request)
@@ -8,8 +8,11 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from rest_framework.decorators import permission_classes
 import stripe, logging
+from django.db import transaction
 from django.utils import timezone
 from booking.models import Booking
+from booking.inventory import claim_seats
+from booking.reservations import reserve_seats, confirm_seats, release_hold
 
 
 logger = logging.getLogger(__name__)
@@ -21,47 +24,72 @@ class CreatePaymentIntentView(APIView):
         try:
             data = request.data
             booking_id = data.get('booking_id')
+            group_id = data.get('group_id')
             
-            try:
-                booking = Booking.objects.get(booking_id=booking_id, user=request.user)
-            except Booking.DoesNotExist:
-                logger.error(f"Booking not found or does not belong to this user: {booking_id}")
+            if group_id:
+                booking = Booking.objects.select_related('event').filter(group_id=group_id, user=request.user).first()
+            else:
+                booking = Booking.objects.select_related('event').filter(booking_id=booking_id, user=request.user).first()
+            if booking is None:
+                logger.error(f"Booking not found or does not belong to this user: {group_id or booking_id}")
                 return Response({'error': 'Booking not found or does not belong to this user'}, status=status.HTTP_404_NOT_FOUND)
             
+            # A group is paid for with one combined intent covering all of its tickets
+            if booking.group_id:
+                bookings = list(Booking.objects.filter(group_id=booking.group_id, user=request.user))
+            else:
+                bookings = [booking]
+            active_bookings = [item for item in bookings if not item.is_booking_cancelled]
+            if not active_bookings:
+                return Response({'error': 'This booking has expired, please book again'}, status=status.HTTP_400_BAD_REQUEST)
+            # Tickets cancelled out of a group are no longer part of its intent
+            booking = active_bookings[0]
+            total_price = sum(item.total_price for item in active_bookings)
+            
+            # The hold may have lapsed while the user sat on the checkout page; take it again if seats are still free
+            if booking.payment_status == 'pending' and not reserve_seats(booking.event, booking.hold_id, len(active_bookings)):
+                return Response({'error': 'Sorry, this event is sold out'}, status=status.HTTP_409_CONFLICT)
+            
             if booking.payment_id:
                 if booking.payment_status == 'pending':
                     payment_intent = stripe.PaymentIntent.retrieve(booking.payment_id)
                     return Response({
                         'clientSecret': payment_intent.client_secret,
                         'publishableKey': settings.STRIPE_PUBLISHABLE_KEY,
-                        'amount': booking.total_price,
+                        'amount': total_price,
                         'currency': 'INR',
                     })
                 else:
                     return Response({'error': 'Payment already processed for this booking'}, status=status.HTTP_400_BAD_REQUEST)
             
-            amount = int(booking.total_price * 100)
+            amount = int(total_price * 100)
+            metadata = {
+                'booking_id': str(booking.booking_id),
+                'user_id': request.user.user_id,
+                'event_id': booking.event.eventId,
+            }
+            if booking.group_id:
+                metadata['group_id'] = str(booking.group_id)
+                metadata['quantity'] = len(active_bookings)
             
             payment_intent = stripe.PaymentIntent.create(
                 amount=amount,
                 currency='inr',
-                metadata={
-                    'booking_id': str(booking.booking_id),
-                    'user_id': request.user.user_id,
-                    'event_id': booking.event.eventId,
-                },
+                metadata=metadata,
                 receipt_email=request.user.email,
                 automatic_payment_methods={'enabled': True},
             )
             
-            booking.payment_id = payment_intent.id
-            booking.save()
+            Booking.objects.filter(booking_id__in=[item.booking_id for item in active_bookings]).update(
+                payment_id=payment_intent.id, updated_at=timezone.now()
+            )
             
             return Response({
                 'bookingId': booking.booking_id,
+                'groupId': booking.group_id,
                 'clientSecret': payment_intent.client_secret,
                 'publishableKey': settings.STRIPE_PUBLISHABLE_KEY,
-                'amount': booking.total_price,
+                'amount': total_price,
                 'currency': 'INR',
             })
             
@@ -118,24 +146,82 @@ def stripe_webhook(request):
 
 
 def handle_payment_intent_succeeded(payment_intent):
-    try:
-        booking = Booking.objects.get(payment_id=payment_intent['id'])
-        booking.payment_status = 'confirmed'
-        booking.payment_date = timezone.now()
-        booking.save()
+    with transaction.atomic():
+        bookings = list(Booking.objects.select_for_update().select_related('event').filter(payment_id=payment_intent['id']))
+        if not bookings:
+            logger.error(f"Booking not found: {payment_intent['id']}")
+            return
+        
+        booking = bookings[0]
+        if booking.payment_status in ('confirmed', 'refunded'):
+            return
         
-        booking.confirm()
-    except Booking.DoesNotExist:
-        logger.error(f"Booking not found: {payment_intent['id']}")
-        pass
+        now = timezone.now()
+        paid_bookings = [item for item in bookings if not item.is_booking_cancelled]
+        # If the hold expired before the payment landed, the seats of every ticket still in the intent are taken again
+        expired = not paid_bookings
+        if expired:
+            paid_bookings = bookings
+        if not _claim_paid_seats(booking, len(paid_bookings), expired):
+            # The refund is only sent once the bookings are marked refunded, so no row lock is
+            # held across the Stripe call and a rolled back webhook never leaves a stray refund
+            Booking.objects.filter(payment_id=payment_intent['id']).update(
+                payment_status='refunded', payment_date=now, updated_at=now
+            )
+            transaction.on_commit(lambda: _refund_payment(payment_intent['id']))
+            logger.error(f"Seats for booking {booking.hold_id} were no longer available, payment refunded")
+            return
+        
+        Booking.objects.filter(booking_id__in=[item.booking_id for item in paid_bookings]).update(
+            payment_status='confirmed', payment_date=now, is_booking_cancelled=False, updated_at=now
+        )
+        transaction.on_commit(lambda: confirm_seats(booking.event_id, booking.hold_id, len(paid_bookings)))
 
 
-def handle_payment_intent_failed(payment_intent):
+def _refund_payment(payment_intent_id):
     try:
-        booking = Booking.objects.get(payment_id=payment_intent['id'])
-        booking.payment_status = 'failed'
-        booking.save()
-    except Booking.DoesNotExist:
-        logger.error(f"Booking not found for failed payment: {payment_intent['id']}")
-        pass
+        stripe.Refund.create(payment_intent=payment_intent_id, idempotency_key=f"refund-{payment_intent_id}")
+    except stripe.error.StripeError as e:
+        logger.error(f"Error refunding payment {payment_intent_id}: {str(e)}")
 
+
+def _claim_paid_seats(booking, quantity, expired):
+    # Unpaid seats only live in the Redis hold, so ticketsSold is claimed once the payment lands
+    if expired and not reserve_seats(booking.event, booking.hold_id, quantity):
+        return False
+    if not claim_seats(booking.event_id, quantity):
+        transaction.on_commit(lambda: release_hold(booking.event_id, booking.hold_id))
+        return False
+    return True
+
+
+def leave_payment_intent(booking):
+    # A ticket cancelled before payment drops out of its intent: the rest of the group is charged
+    # for what is left, and the webhook only confirms the tickets that were still in the intent
+    remaining = list(
+        Booking.objects.select_for_update().filter(payment_id=booking.payment_id, is_booking_cancelled=False)
+        .exclude(booking_id=booking.booking_id).order_by('booking_id')
+    )
+    try:
+        if remaining:
+            stripe.PaymentIntent.modify(
+                booking.payment_id,
+                amount=int(sum(item.total_price for item in remaining) * 100),
+                metadata={'quantity': len(remaining)},
+            )
+        else:
+            stripe.PaymentIntent.cancel(booking.payment_id)
+    except stripe.error.StripeError as e:
+        logger.error(f"Error updating payment intent {booking.payment_id}: {str(e)}")
+        return False
+    
+    booking.payment_id = None
+    return True
+
+
+def handle_payment_intent_failed(payment_intent):
+    updated = Booking.objects.filter(payment_id=payment_intent['id']).update(
+        payment_status='failed', updated_at=timezone.now()
+    )
+    if not updated:
+        logger.error(f"Booking not found for failed payment: {payment_intent['id']}")
@@ -0,0 +1,102 @@
+from django.db import transaction, IntegrityError
+from django.db.models import Q, Count, Max
+from django.utils import timezone
+from datetime import timedelta
+import hashlib, json
+from booking.models import Booking, DailyBookingRollup
+from events.models import Event
+from users.models import Users
+from categories.models import Category
+from admin.views import prepare_report_data as prepare_admin_report_data
+from admin.report_generators import ExcelReportGenerator, PDFReportGenerator, CSVReportGenerator
+from organizers.views import prepare_report_data as prepare_organizer_report_data
+from organizers.organizer_report_generators import OrganizerExcelGenerator, OrganizerPDFGenerator, OrganizerCSVGenerator
+from .models import ReportJob
+
+
+# A job still pending or running after this long is assumed lost and no longer reused
+REPORT_JOB_TIMEOUT = timedelta(minutes=15)
+
+ADMIN_GENERATORS = {'pdf': PDFReportGenerator, 'xlsx': ExcelReportGenerator, 'csv': CSVReportGenerator}
+ORGANIZER_GENERATORS = {'pdf': OrganizerPDFGenerator, 'xlsx': OrganizerExcelGenerator, 'csv': OrganizerCSVGenerator}
+
+
+def report_cache_key(scope, report_format, organizer=None):
+    # Every part is an indexed lookup. Rollup rows move with each booking insert and each status
+    # or price change; the updated_at watermarks catch edits to the other columns the reports
+    # print: booking details, event titles, customer and organizer names, category names
+    rollups = DailyBookingRollup.objects.all()
+    events = Event.objects.all()
+    if organizer:
+        rollups = rollups.filter(organizer=organizer)
+        events = events.filter(hostedBy=organizer)
+    
+    version = [
+        rollups.aggregate(count=Count('id'), changed=Max('updated_at')),
+        events.aggregate(changed=Max('updatedAt')),
+        Users.objects.aggregate(changed=Max('updated_at')),
+        Category.objects.aggregate(changed=Max('updated_at')),
+    ]
+    if not organizer:
+        # Only the admin report lists payment ids, which are set without touching the rollups
+        version.append(Booking.objects.aggregate(changed=Max('updated_at')))
+    params = [scope, report_format, str(organizer.pk) if organizer else None, version]
+    return hashlib.sha256(json.dumps(params, default=str, sort_keys=True).encode()).hexdigest()
+
+
+def request_report(user, scope, report_format):
+    from .tasks import render_report_job
+    
+    organizer = user if scope == 'organizer' else None
+    cache_key = report_cache_key(scope, report_format, organizer)
+    
+    reusable = _reusable_job(cache_key)
+    if reusable:
+        return reusable, False
+    
+    # A lost render would hold the in-flight slot for its key forever, so it is given up first
+    now = timezone.now()
+    ReportJob.objects.filter(
+        cache_key=cache_key, status__in=['pending', 'running'], created_at__lt=now - REPORT_JOB_TIMEOUT
+    ).update(status='failed', error='Report job timed out', completed_at=now)
+    
+    try:
+        with transaction.atomic():
+            job = ReportJob.objects.create(
+                requested_by=user, organizer=organizer, scope=scope, report_format=report_format, cache_key=cache_key
+            )
+    except IntegrityError:
+        # An identical request created the job between our lookup and insert; join that one
+        reusable = _reusable_job(cache_key)
+        if reusable is None:
+            raise
+        return reusable, False
+    
+    transaction.on_commit(lambda: render_report_job.delay(str(job.job_id)))
+    return job, True
+
+
+def _reusable_job(cache_key):
+    # An identical request is answered by the finished artifact, or joins the render in flight
+    return ReportJob.objects.filter(cache_key=cache_key).filter(
+        Q(status='completed') |
+        Q(status__in=['pending', 'running'], created_at__gte=timezone.now() - REPORT_JOB_TIMEOUT)
+    ).order_by('-created_at').first()
+
+
+def render_report(job):
+    # Returns the artifact as an iterable of chunks; booking rows are only fetched as it is consumed
+    if job.scope == 'admin':
+        events_qs = Event.objects.select_related('hostedBy', 'category')
+        bookings_qs = Booking.objects.select_related('event', 'user', 'event__hostedBy', 'event__category')
+        report_data = prepare_admin_report_data(events_qs, bookings_qs, DailyBookingRollup.objects.all(), stream=True)
+        generator = ADMIN_GENERATORS[job.report_format]()
+    else:
+        bookings_qs = Booking.objects.filter(event__hostedBy=job.organizer).select_related('event', 'user', 'event__category')
+        rollups_qs = DailyBookingRollup.objects.filter(organizer=job.organizer)
+        report_data = prepare_organizer_report_data(job.organizer, bookings_qs, rollups_qs, stream=True)
+        generator = ORGANIZER_GENERATORS[job.report_format]()
+    
+    if job.report_format == 'pdf':
+        return [generator.generate_revenue_report(report_data).getvalue()]
+    return generator.stream_revenue_report(report_data)
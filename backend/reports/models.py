@@ -0,0 +1,68 @@
+from django.db import models
+from django.urls import reverse
+import uuid
+
+
+# Create your models here.
+
+
+class ReportJob(models.Model):
+    SCOPE_CHOICES = (
+        ('admin', 'Admin'),
+        ('organizer', 'Organizer'),
+    )
+    FORMAT_CHOICES = (
+        ('pdf', 'PDF'),
+        ('xlsx', 'Excel'),
+        ('csv', 'CSV'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+    
+    job_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    requested_by = models.ForeignKey('users.Users', on_delete=models.CASCADE, related_name='report_jobs')
+    organizer = models.ForeignKey('users.Users', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    report_format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # Hash of the report parameters and the data version they were rendered from
+    cache_key = models.CharField(max_length=64)
+    artifact = models.FileField(upload_to='reports/', null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['cache_key', '-created_at'], name='reportjob_cache_key_idx'),
+        ]
+        constraints = [
+            # At most one render in flight per cache key, however many identical requests race
+            models.UniqueConstraint(
+                fields=['cache_key'], condition=models.Q(status__in=['pending', 'running']), name='reportjob_inflight_uniq'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.scope} {self.report_format} report {self.job_id} ({self.status})"
+    
+    def is_visible_to(self, user):
+        if self.scope == 'admin':
+            return user.role == 'admin'
+        return self.organizer_id == user.pk
+    
+    def to_payload(self):
+        return {
+            'job_id': str(self.job_id),
+            'scope': self.scope,
+            'format': self.report_format,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'download_url': reverse('report-job-download', args=[self.job_id]) if self.status == 'completed' else None,
+        }
@@ -0,0 +1,51 @@
+from celery import shared_task
+from django.core.files import File
+from django.utils import timezone
+from datetime import timedelta
+import logging, tempfile, time
+from .models import ReportJob
+from .jobs import render_report
+
+
+logger = logging.getLogger(__name__)
+
+REPORT_ARTIFACT_TTL_DAYS = 7
+
+
+@shared_task
+def render_report_job(job_id):
+    started = time.monotonic()
+    # Claimed with a conditional update so a redelivered task never renders the same job twice
+    claimed = ReportJob.objects.filter(job_id=job_id, status='pending').update(status='running')
+    if not claimed:
+        return f"Report job {job_id} was already claimed"
+    
+    job = ReportJob.objects.select_related('organizer').get(job_id=job_id)
+    try:
+        with tempfile.TemporaryFile() as output:
+            for chunk in render_report(job):
+                output.write(chunk.encode() if isinstance(chunk, str) else chunk)
+            output.seek(0)
+            job.artifact.save(f'{job.cache_key}.{job.report_format}', File(output), save=False)
+    except Exception as e:
+        logger.error(f"Error rendering report job {job_id}: {e}")
+        ReportJob.objects.filter(job_id=job_id).update(status='failed', error=str(e), completed_at=timezone.now())
+        return f"Report job {job_id} failed: {e}"
+    
+    ReportJob.objects.filter(job_id=job_id).update(status='completed', artifact=job.artifact.name, completed_at=timezone.now())
+    
+    elapsed = time.monotonic() - started
+    return f"Rendered {job.scope} {job.report_format} report {job_id} in {elapsed:.2f}s"
+
+
+@shared_task
+def purge_report_artifacts(max_age_days=REPORT_ARTIFACT_TTL_DAYS):
+    started = time.monotonic()
+    expired = ReportJob.objects.filter(created_at__lt=timezone.now() - timedelta(days=max_age_days))
+    
+    for job in expired.exclude(artifact='').exclude(artifact__isnull=True).iterator():
+        job.artifact.delete(save=False)
+    purged_count, _ = expired.delete()
+    
+    elapsed = time.monotonic() - started
+    return f"Purged {purged_count} report jobs older than {max_age_days} days in {elapsed:.2f}s"
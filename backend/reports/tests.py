@@ -0,0 +1,82 @@
+from django.test import TestCase
+from unittest import mock
+from datetime import date, time, timedelta
+from users.models import Users
+from categories.models import Category
+from events.models import Event
+from booking.models import Booking
+from .models import ReportJob
+from .jobs import request_report, report_cache_key
+
+
+class ReportJobCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Users.objects.create_user(email='admin@example.com', password='pass', full_name='Admin', mobile=9000000001, role='admin')
+        cls.organizer = Users.objects.create_user(email='host@example.com', password='pass', full_name='Host', mobile=9000000002, role='organizer')
+        cls.customer = Users.objects.create_user(email='guest@example.com', password='pass', full_name='Guest', mobile=9000000003)
+        cls.music = Category.objects.create(categoryName='Music')
+        cls.concert = Event.objects.create(
+            title='Concert', category=cls.music, pricePerTicket=500, ticketLimit=100,
+            hostedBy=cls.organizer, description='Live music', date=date.today() + timedelta(days=7), time=time(18, 0)
+        )
+        Booking.objects.create(user=cls.customer, event=cls.concert, booking_name='Guest', total_price=500, payment_status='confirmed')
+
+    def _book(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(user=self.customer, event=self.concert, booking_name='Guest', total_price=500, payment_status='confirmed')
+
+    def test_identical_request_reuses_the_job(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            job, created = request_report(self.admin, 'admin', 'csv')
+        self.assertTrue(created)
+        self.assertEqual(len(callbacks), 1)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            reused, created = request_report(self.admin, 'admin', 'csv')
+        self.assertFalse(created)
+        self.assertEqual(reused.pk, job.pk)
+        self.assertEqual(callbacks, [])
+
+        ReportJob.objects.filter(pk=job.pk).update(status='completed')
+        reused, created = request_report(self.admin, 'admin', 'csv')
+        self.assertFalse(created)
+        self.assertEqual(reused.pk, job.pk)
+
+    def test_racing_request_joins_the_render_in_flight(self):
+        cache_key = report_cache_key('admin', 'csv')
+        running = ReportJob.objects.create(requested_by=self.admin, scope='admin', report_format='csv', cache_key=cache_key, status='running')
+
+        # The first lookup misses as if the other request hadn't inserted yet; the constraint catches the insert
+        with mock.patch('reports.jobs._reusable_job', side_effect=[None, running]):
+            job, created = request_report(self.admin, 'admin', 'csv')
+        self.assertFalse(created)
+        self.assertEqual(job.pk, running.pk)
+        self.assertEqual(ReportJob.objects.filter(cache_key=cache_key).count(), 1)
+
+    def test_new_data_misses_the_cache(self):
+        job, _ = request_report(self.organizer, 'organizer', 'xlsx')
+        ReportJob.objects.filter(pk=job.pk).update(status='completed')
+
+        self._book()
+        fresh, created = request_report(self.organizer, 'organizer', 'xlsx')
+        self.assertTrue(created)
+        self.assertNotEqual(fresh.cache_key, job.cache_key)
+
+    def test_printed_names_are_part_of_the_key(self):
+        admin_key = report_cache_key('admin', 'pdf')
+        organizer_key = report_cache_key('organizer', 'pdf', self.organizer)
+
+        self.music.categoryName = 'Live Music'
+        self.music.save()
+        self.assertNotEqual(report_cache_key('admin', 'pdf'), admin_key)
+        self.assertNotEqual(report_cache_key('organizer', 'pdf', self.organizer), organizer_key)
+
+    def test_lost_render_is_replaced(self):
+        job, _ = request_report(self.admin, 'admin', 'pdf')
+        ReportJob.objects.filter(pk=job.pk).update(created_at=job.created_at - timedelta(hours=1))
+
+        fresh, created = request_report(self.admin, 'admin', 'pdf')
+        self.assertTrue(created)
+        self.assertEqual(ReportJob.objects.get(pk=job.pk).status, 'failed')
+        self.assertEqual(ReportJob.objects.filter(cache_key=fresh.cache_key, status__in=['pending', 'running']).count(), 1)
@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import ReportJobCreateView, ReportJobDetailView, ReportJobDownloadView
+
+
+urlpatterns = [
+    path('jobs/', ReportJobCreateView.as_view(), name='report-jobs'),
+    path('jobs/<uuid:job_id>/', ReportJobDetailView.as_view(), name='report-job-detail'),
+    path('jobs/<uuid:job_id>/download/', ReportJobDownloadView.as_view(), name='report-job-download'),
+]
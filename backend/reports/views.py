@@ -0,0 +1,81 @@
+from rest_framework import status
+from rest_framework.decorators import permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+import logging
+from admin.permissions import IsAdminUser
+from organizers.permissions import IsOrganizerUser
+from eventify.exports import streaming_export, stream_file, CSV_CONTENT_TYPE, PDF_CONTENT_TYPE, XLSX_CONTENT_TYPE
+from .models import ReportJob
+from .jobs import request_report
+
+
+logger = logging.getLogger(__name__)
+
+SCOPE_PERMISSIONS = {'admin': IsAdminUser, 'organizer': IsOrganizerUser}
+CONTENT_TYPES = {'pdf': PDF_CONTENT_TYPE, 'xlsx': XLSX_CONTENT_TYPE, 'csv': CSV_CONTENT_TYPE}
+FILENAME_PREFIXES = {'admin': 'revenue_report', 'organizer': 'organizer_revenue_report'}
+
+
+@permission_classes([IsAuthenticated])
+class ReportJobCreateView(APIView):
+    def post(self, request):
+        try:
+            scope = request.data.get('scope')
+            report_format = request.data.get('format')
+            
+            if scope not in SCOPE_PERMISSIONS:
+                return Response({"success": False, "error": "scope must be 'admin' or 'organizer'"}, status=status.HTTP_400_BAD_REQUEST)
+            if report_format not in CONTENT_TYPES:
+                return Response({"success": False, "error": "format must be 'pdf', 'xlsx' or 'csv'"}, status=status.HTTP_400_BAD_REQUEST)
+            permission = SCOPE_PERMISSIONS[scope]()
+            if not permission.has_permission(request, self):
+                return Response({"success": False, "error": permission.message}, status=status.HTTP_403_FORBIDDEN)
+            
+            job, created = request_report(request.user, scope, report_format)
+            
+            return Response({"success": True, "job": job.to_payload()}, status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK)
+        except Exception as e:
+            logger.error(f"Error requesting report job: {e}")
+            return Response({"success": False, "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@permission_classes([IsAuthenticated])
+class ReportJobDetailView(APIView):
+    def get(self, request, job_id):
+        try:
+            job = ReportJob.objects.get(job_id=job_id)
+            if not job.is_visible_to(request.user):
+                raise ReportJob.DoesNotExist
+            
+            return Response({"success": True, "job": job.to_payload()}, status=status.HTTP_200_OK)
+        except (ReportJob.DoesNotExist, ValidationError):
+            return Response({"success": False, "error": "Report job not found"}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.error(f"Error fetching report job {job_id}: {e}")
+            return Response({"success": False, "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@permission_classes([IsAuthenticated])
+class ReportJobDownloadView(APIView):
+    def get(self, request, job_id):
+        try:
+            job = ReportJob.objects.get(job_id=job_id)
+            if not job.is_visible_to(request.user):
+                raise ReportJob.DoesNotExist
+            if job.status != 'completed':
+                return Response({"success": False, "error": f"Report is {job.status}", "job": job.to_payload()}, status=status.HTTP_409_CONFLICT)
+            
+            generated_at = timezone.localtime(job.completed_at).strftime("%Y%m%d_%H%M%S")
+            return streaming_export(
+                request, stream_file(job.artifact.open('rb')),
+                f'{FILENAME_PREFIXES[job.scope]}_{generated_at}.{job.report_format}', CONTENT_TYPES[job.report_format]
+            )
+        except (ReportJob.DoesNotExist, ValidationError):
+            return Response({"success": False, "error": "Report job not found"}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.error(f"Error downloading report job {job_id}: {e}")
+            return Response({"success": False, "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import datetime, timezone as dt_timezone
+from .models import Users
+
+
+# Bump when the cached Users shape changes so old pickles are ignored after a deploy
+USER_CACHE_VERSION = 1
+USER_CACHE_TIMEOUT = 60
+
+USER_CACHE_PREFIX = 'auth:user'
+REVOKED_TOKEN_PREFIX = 'auth:revoked'
+
+
+def user_cache_key(user_id):
+    return f"{USER_CACHE_PREFIX}:v{USER_CACHE_VERSION}:{user_id}"
+
+
+def revoked_token_key(jti):
+    return f"{REVOKED_TOKEN_PREFIX}:{jti}"
+
+
+def get_user_for_token(user_id, jti):
+    # The user and the revocation flag come back in one round trip; the database is only hit on a miss
+    user_key = user_cache_key(user_id)
+    revoked_key = revoked_token_key(jti)
+    cached = cache.get_many([user_key, revoked_key])
+    if cached.get(revoked_key):
+        return None, True
+    
+    user = cached.get(user_key)
+    if user is None:
+        user = Users.objects.get(user_id=user_id)
+        cache.set(user_key, user, timeout=USER_CACHE_TIMEOUT)
+    return user, False
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def revoke_token(jti, expires_at):
+    if isinstance(expires_at, (int, float)):
+        expires_at = datetime.fromtimestamp(expires_at, tz=dt_timezone.utc)
+    
+    # Kept only until the token would have expired anyway
+    remaining = int((expires_at - timezone.now()).total_seconds())
+    if remaining > 0:
+        cache.set(revoked_token_key(jti), 1, timeout=remaining)
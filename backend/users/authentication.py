@@ -1,8 +1,9 @@
-from rest_framework_simplejwt.tokens import AccessToken, BlacklistedToken, TokenError
+from rest_framework_simplejwt.tokens import AccessToken, TokenError
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 import logging
 from .models import Users
+from .auth_cache import get_user_for_token
 
 
 logger = logging.getLogger(__name__)
@@ -18,9 +19,9 @@ class JWTAuthenticationFromCookies(BaseAuthentication):
 
         try:
             token = AccessToken(access_token)
-            user = Users.objects.get(user_id=token["user_id"])
+            user, revoked = get_user_for_token(token["user_id"], token["jti"])
 
-            if BlacklistedToken.objects.filter(token__jti=token["jti"]).exists():
+            if revoked:
                 raise AuthenticationFailed("Token has been blacklisted.")
             if user.is_blocked:
                 raise AuthenticationFailed("User is blocked.")
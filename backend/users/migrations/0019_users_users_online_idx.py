@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0018_users_users_full_name_trgm_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='users',
+            index=models.Index(condition=models.Q(('is_online', True)), fields=['user_id'], name='users_online_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 03:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0019_users_users_online_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='users',
+            index=models.Index(fields=['updated_at'], name='users_updated_idx'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 from django.utils import timezone
 import uuid
 
@@ -55,10 +57,35 @@ class Users(AbstractBaseUser, BaseUserManager):
     objects = UsersManager()
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
+    # Fields the user sees on their profile; only changes to these send a profile-update mail
+    PROFILE_NOTIFY_FIELDS = ('full_name', 'email', 'mobile', 'profile_image', 'password')
+
+    class Meta:
+        indexes = [
+            GinIndex(OpClass(Upper('full_name'), name='gin_trgm_ops'), name='users_full_name_trgm_idx'),
+            models.Index(fields=['user_id'], condition=models.Q(is_online=True), name='users_online_idx'),
+            models.Index(fields=['updated_at'], name='users_updated_idx'),
+        ]
 
     def __str__(self):
         return self.email
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_profile_fields()
+        return instance
+    
+    def snapshot_profile_fields(self):
+        loaded_fields = self.get_deferred_fields()
+        self._profile_snapshot = {
+            name: getattr(self, name) for name in self.PROFILE_NOTIFY_FIELDS if name not in loaded_fields
+        }
+    
+    def get_changed_profile_fields(self):
+        snapshot = getattr(self, '_profile_snapshot', {})
+        return [name for name, value in snapshot.items() if getattr(self, name) != value]
+    
     def update_last_seen(self):
         self.last_seen = timezone.now()
         self.save(update_fields=['last_seen'])
@@ -69,21 +96,21 @@ class Users(AbstractBaseUser, BaseUserManager):
             self.last_seen = timezone.now()
         self.save(update_fields=['is_online', 'last_seen'])
     
-    def get_online_status(self):
-        if self.is_online:
-            return "online"
+    def get_presence(self):
+        # Live presence is kept in Redis; the columns here are only refreshed by the periodic flush
+        if not hasattr(self, '_presence'):
+            from chat.presence import get_presence
+            self._presence = get_presence([self.user_id])[str(self.user_id)]
         
-        now = timezone.now()
-        time_diff = now - self.last_seen
+        # HTTP activity is written to the column, chat activity to Redis; the later one wins
+        last_seen = max(filter(None, [self._presence['last_seen'], self.last_seen]), default=None)
+        return {
+            'is_online': self._presence['is_online'],
+            'last_seen': last_seen,
+        }
+    
+    def get_online_status(self):
+        from chat.presence import get_status_text
         
-        if time_diff.total_seconds() < 300:
-            return "recently_active"
-        elif time_diff.days == 0:
-            return "today"
-        elif time_diff.days == 1:
-            return "yesterday"
-        elif time_diff.days < 7:
-            return f"{time_diff.days} days ago"
-        else:
-            return "long_time_ago"
-
+        presence = self.get_presence()
+        return get_status_text(presence['is_online'], presence['last_seen'])
@@ -1,19 +1,51 @@
 # users/signals.py
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from django.utils.html import strip_tags
 from django.utils import timezone
-from django.conf import settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from notifications.outbox import enqueue_email
+from .auth_cache import invalidate_cached_user, revoke_token
 from .models import Users
 
 
 @receiver(post_save, sender=Users)
-def handle_user_email_notifications(sender, instance, created, **kwargs):
+@receiver(post_delete, sender=Users)
+def invalidate_auth_cache(sender, instance, **kwargs):
+    # Any save may change what authentication sees (block status, role, profile), so the cached copy is dropped
+    invalidate_cached_user(instance.user_id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def mirror_blacklisted_token(sender, instance, created, **kwargs):
+    if created:
+        revoke_token(instance.token.jti, instance.token.expires_at)
+
+
+PROFILE_FIELD_LABELS = {
+    'full_name': 'name',
+    'email': 'email address',
+    'mobile': 'mobile number',
+    'profile_image': 'profile picture',
+    'password': 'password',
+}
+
+
+@receiver(post_save, sender=Users)
+def handle_user_email_notifications(sender, instance, created, update_fields=None, **kwargs):
     if created:
         send_welcome_email(instance)
-    else:
-        send_profile_update_email(instance)
+        instance.snapshot_profile_fields()
+        return
+    
+    # Presence and activity saves pass update_fields, so they are skipped without diffing
+    if update_fields is not None and not set(update_fields) & set(Users.PROFILE_NOTIFY_FIELDS):
+        return
+    
+    changed_fields = instance.get_changed_profile_fields()
+    if changed_fields:
+        previous_email = instance._profile_snapshot.get('email')
+        send_profile_update_email(instance, changed_fields, previous_email)
+    instance.snapshot_profile_fields()
 
 
 def send_welcome_email(user):
@@ -46,23 +78,16 @@ def send_welcome_email(user):
         </html>
         """
         
-        plain_message = strip_tags(html_message)
-        send_mail(
-            'Welcome to Eventify!',
-            plain_message,
-            settings.EMAIL_HOST_USER,
-            [user_email],
-            fail_silently=False,
-            html_message=html_message,
-        )
+        enqueue_email('Welcome to Eventify!', html_message, [user_email])
     except Exception as e:
         print(f"Error sending welcome email to {user.email}: {str(e)}")
 
-def send_profile_update_email(user):
+def send_profile_update_email(user, changed_fields, previous_email=None):
     try:
         user_email = user.email
         full_name = user.full_name
         first_name = full_name.split()[0] if full_name else "there"
+        changes = ', '.join(PROFILE_FIELD_LABELS[name] for name in changed_fields)
         
         html_message = f"""
         <html>
@@ -71,6 +96,7 @@ def send_profile_update_email(user):
                     <h2 style="color: #4CAF50; text-align: center;">Profile Updated</h2>
                     <p>Hi {first_name.title()},</p>
                     <p>Your Eventify profile has been successfully updated.</p>
+                    <p><strong>Changed:</strong> {changes}</p>
                     <p>If you did not make these changes or if you believe there has been an unauthorized access to your account, please contact our support team immediately.</p>
                     <p style="margin-top: 20px;">Best regards,<br><strong>The Eventify Team</strong></p>
                 </div>
@@ -81,15 +107,12 @@ def send_profile_update_email(user):
         </html>
         """
         
-        plain_message = strip_tags(html_message)
-        send_mail(
-            'Eventify: Profile Updated',
-            plain_message,
-            settings.EMAIL_HOST_USER,
-            [user_email],
-            fail_silently=False,
-            html_message=html_message,
-        )
+        # An email change is also reported to the old address in case the account was taken over
+        recipients = [user_email]
+        if previous_email and previous_email != user_email:
+            recipients.append(previous_email)
+        
+        enqueue_email('Eventify: Profile Updated', html_message, recipients)
     except Exception as e:
         print(f"Error sending profile update email to {user.email}: {str(e)}")
 
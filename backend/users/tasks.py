@@ -0,0 +1,19 @@
+from celery import shared_task
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .auth_cache import revoke_token
+
+
+@shared_task
+def sync_revoked_tokens():
+    # Rebuilds the Redis revocation set from the blacklist table in case Redis lost it
+    blacklisted = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).values_list(
+        'token__jti', 'token__expires_at'
+    )
+    
+    synced_count = 0
+    for jti, expires_at in blacklisted.iterator(chunk_size=1000):
+        revoke_token(jti, expires_at)
+        synced_count += 1
+    
+    return f"Synced {synced_count} revoked tokens"
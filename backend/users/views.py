@@ -5,10 +5,8 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.exceptions import ValidationError
 from django.contrib.auth.hashers import make_password
-from django.core.mail import send_mail
-from django.utils.html import strip_tags
 from django.utils import timezone
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
 from rest_framework_simplejwt.exceptions import TokenError as SimpleJWTTokenError, ExpiredTokenError
 from django.core.cache import cache
 import random, requests, json, re, logging
@@ -16,12 +14,14 @@ from datetime import datetime
 from django.conf import settings
 from organizers.models import OrganizerProfile
 from organizers.serializers import OrganizerProfileSerializer
+from notifications.outbox import enqueue_email
 from .email_templates import registration_email_template, resend_otp_email_template, password_reset_email_template
 from .serializers import (
     UserRegistrationSerializer, LoginSerializer, CompleteRegistrationSerializer, UserProfileSerializer,
     ChangePasswordSerializer
 )
 from .models import Users
+from .auth_cache import revoke_token
 
 
 logger = logging.getLogger(__name__)
@@ -80,15 +80,7 @@ class RegisterView(APIView):
 
                 first_name = user_data['full_name'].split()[0]
                 html_message = registration_email_template(first_name, otp)
-                plain_message = strip_tags(html_message)
-                send_mail(
-                    'Eventify: Verify Your Email Address',
-                    plain_message,
-                    settings.EMAIL_HOST_USER,
-                    [email],
-                    fail_silently=False,
-                    html_message=html_message,
-                )
+                enqueue_email('Eventify: Verify Your Email Address', html_message, [email])
 
                 logger.info(f"Registration initiated for email: {email}, temp_user_id: {temp_user_id}")
                 return Response({'temp_user_id': str(temp_user_id), 'message': 'OTP sent to your email'}, status=status.HTTP_201_CREATED)
@@ -118,15 +110,7 @@ class ResendOTPView(APIView):
         
         first_name = user_data['full_name'].split()[0]
         html_message = resend_otp_email_template(first_name, new_otp)
-        plain_message = strip_tags(html_message)
-        send_mail(
-            'Eventify: Your New Verification Code',
-            plain_message,
-            settings.EMAIL_HOST_USER,
-            [user_data['email']],
-            fail_silently=False,
-            html_message=html_message,
-        )
+        enqueue_email('Eventify: Your New Verification Code', html_message, [user_data['email']])
         
         return Response({'message': 'New OTP sent to your email'}, status=status.HTTP_200_OK)
 
@@ -209,15 +193,7 @@ class ForgotPasswordEmailCheckView(APIView):
         cache.set(redis_key, json.dumps(reset_data), timeout=600)
         
         html_message = password_reset_email_template(user.full_name, otp)
-        plain_message = strip_tags(html_message)
-        send_mail(
-            'Eventify: Password Reset OTP',
-            plain_message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-            html_message=html_message,
-        )
+        enqueue_email('Eventify: Password Reset OTP', html_message, [user.email], from_email=settings.DEFAULT_FROM_EMAIL)
         return Response({'temp_user_id': str(temp_user_id), 'message': 'OTP sent to your email'}, status=status.HTTP_200_OK)
 
 
@@ -362,6 +338,15 @@ class LogoutView(APIView):
     def post(self, request):
         try:
             refresh_token = request.COOKIES.get("refresh_token")
+            access_token = request.COOKIES.get("access_token")
+
+            # The access token stays valid until it expires, so its jti is revoked as well
+            if access_token:
+                try:
+                    token = AccessToken(access_token)
+                    revoke_token(token["jti"], token["exp"])
+                except SimpleJWTTokenError:
+                    pass
 
             if refresh_token:
                 try: